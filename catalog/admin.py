@@ -1,34 +1,121 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
 from .models import (
-    Category, Listing,
-    Product, ProductVariant, Inventory, ProductGroup,
+    Category, Listing, PendingListing, ListingModeration,
+    Product, ProductVariant, Inventory, ProductGroup, StockReservation,
     Service, ServicePackage, ServiceRequest,
     Car, Property, Booking
 )
+from .moderation import moderate
+
+# Above this many rows an unfiltered changelist shows the planner's estimate instead of COUNT(*).
+ESTIMATED_COUNT_THRESHOLD = 100_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Uses pg_class.reltuples for the unfiltered row count of big tables on Postgres."""
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        connection = connections[qs.db]
+        if connection.vendor == "postgresql" and not qs.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [qs.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow without bound."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug", "parent")
+    list_display = ("name", "slug", "parent", "path")
+    list_select_related = ("parent",)
     search_fields = ("name", "slug")
     list_filter = ("parent",)
     prepopulated_fields = {"slug": ("name",)}
 
 @admin.register(Listing)
-class ListingAdmin(admin.ModelAdmin):
+class ListingAdmin(LargeTableAdmin):
     list_display = ("title", "type", "vendor", "category", "status", "is_active", "created_at")
+    list_select_related = ("vendor", "category")
     list_filter = ("type", "status", "is_active", "category")
     search_fields = ("title", "vendor__display_name", "slug")
     autocomplete_fields = ("category", "vendor")
-    readonly_fields = ("created_at",)
+    # moderation state only changes through the actions below (catalog.moderation keeps the audit trail)
+    readonly_fields = ("status", "is_active", "submitted_at", "published_at", "review_notes", "created_at")
     prepopulated_fields = {"slug": ("title",)}
+    actions = ("approve_listings", "reject_listings")
+
+    @admin.action(description="Approve and publish selected listings")
+    def approve_listings(self, request, queryset):
+        moved = moderate(queryset.values_list("pk", flat=True), Listing.Status.PUBLISHED, request.user)
+        self.message_user(request, f"Published {moved} listings.", messages.SUCCESS)
+
+    @admin.action(description="Reject selected listings")
+    def reject_listings(self, request, queryset):
+        if "apply" in request.POST:
+            notes = request.POST.get("review_notes", "").strip()
+            moved = moderate(queryset.values_list("pk", flat=True), Listing.Status.REJECTED, request.user, notes)
+            self.message_user(request, f"Rejected {moved} listings.", messages.SUCCESS)
+            return None
+        return TemplateResponse(request, "admin/catalog/listing/reject_listings.html", {
+            **self.admin_site.each_context(request),
+            "title": "Reject listings",
+            "opts": self.model._meta,
+            "count": queryset.count(),
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        })
+
+@admin.register(PendingListing)
+class PendingListingAdmin(ListingAdmin):
+    list_display = ("title", "type", "vendor", "category", "submitted_at")
+    list_filter = ("type", "category")
+    ordering = ("submitted_at", "id")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(status=Listing.Status.PENDING)
+
+    def has_add_permission(self, request):
+        return False
+
+@admin.register(ListingModeration)
+class ListingModerationAdmin(LargeTableAdmin):
+    list_display = ("listing", "from_status", "to_status", "actor", "created_at")
+    list_select_related = ("listing", "actor")
+    list_filter = ("to_status", "created_at")
+    search_fields = ("listing__title", "actor__username")
+    readonly_fields = ("listing", "from_status", "to_status", "actor", "notes", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 class ProductVariantInline(admin.TabularInline):
     model = ProductVariant
     extra = 0
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = ("name", "vendor", "sku", "base_price")
+    list_select_related = ("vendor",)
     search_fields = ("name", "sku", "vendor__display_name")
     list_filter = ("vendor",)
     inlines = (ProductVariantInline,)
@@ -36,57 +123,80 @@ class ProductAdmin(admin.ModelAdmin):
 @admin.register(ProductGroup)
 class ProductGroupAdmin(admin.ModelAdmin):
     list_display = ("title", "vendor", "product_count", "created_at")
+    list_select_related = ("vendor",)
     search_fields = ("title", "vendor__display_name")
     list_filter = ("vendor",)
     filter_horizontal = ("products",)
 
-    @admin.display(description="Products")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_product_count=Count("products", distinct=True))
+
+    @admin.display(description="Products", ordering="_product_count")
     def product_count(self, obj):
-        return obj.products.count()
+        return obj._product_count
 
 @admin.register(ProductVariant)
-class ProductVariantAdmin(admin.ModelAdmin):
+class ProductVariantAdmin(LargeTableAdmin):
     list_display = ("product", "sku", "price")
+    list_select_related = ("product",)
     search_fields = ("sku", "product__name")
     list_filter = ("product",)
 
 @admin.register(Inventory)
-class InventoryAdmin(admin.ModelAdmin):
+class InventoryAdmin(LargeTableAdmin):
     list_display = ("variant", "quantity")
+    list_select_related = ("variant__product",)
     search_fields = ("variant__sku", "variant__product__name")
 
+@admin.register(StockReservation)
+class StockReservationAdmin(LargeTableAdmin):
+    list_display = ("token", "variant", "quantity", "status", "expires_at", "created_at")
+    list_select_related = ("variant__product",)
+    list_filter = ("status",)
+    search_fields = ("token", "variant__sku")
+
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     list_display = ("name", "vendor", "pricing_type", "hourly_rate", "base_fixed_price", "is_active")
+    list_select_related = ("vendor",)
     list_filter = ("pricing_type", "is_active", "vendor")
     search_fields = ("name", "vendor__display_name")
 
 @admin.register(ServicePackage)
 class ServicePackageAdmin(admin.ModelAdmin):
     list_display = ("service", "title", "price", "delivery_days", "is_active")
+    list_select_related = ("service",)
     list_filter = ("is_active", "delivery_days")
     search_fields = ("service__name", "title")
 
 @admin.register(ServiceRequest)
-class ServiceRequestAdmin(admin.ModelAdmin):
-    list_display = ("id", "service", "buyer", "status", "quoted_price", "created_at")
-    list_filter = ("status", "created_at")
+class ServiceRequestAdmin(LargeTableAdmin):
+    list_display = ("id", "service", "buyer", "status", "quoted_price", "is_read", "created_at")
+    list_select_related = ("service", "buyer")
+    list_filter = ("status", "is_read", "created_at")
     search_fields = ("service__name", "buyer__username")
 
 @admin.register(Car)
 class CarAdmin(admin.ModelAdmin):
     list_display = ("make", "model", "year", "vendor", "price", "is_active")
+    list_select_related = ("vendor",)
     list_filter = ("is_active", "vendor", "make", "fuel_type", "transmission", "condition")
     search_fields = ("make", "model", "vin", "vendor__display_name")
 
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
     list_display = ("title", "vendor", "city", "property_type", "purpose", "monthly_rent", "sale_price", "is_active")
+    list_select_related = ("vendor",)
     list_filter = ("city", "property_type", "purpose", "is_active", "vendor")
     search_fields = ("title", "city", "vendor__display_name")
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(LargeTableAdmin):
     list_display = ("bookable", "buyer", "start_date", "end_date", "quantity", "status", "total_price")
+    list_select_related = ("buyer",)
     list_filter = ("status", "start_date", "end_date")
     search_fields = ("buyer__username",)
+
+    def get_queryset(self, request):
+        # resolves the page's bookables with one query per content type
+        return super().get_queryset(request).prefetch_related("bookable")
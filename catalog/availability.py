@@ -0,0 +1,57 @@
+# catalog/availability.py
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+
+from .models import Booking
+from .occupancy import booked_objects, booked_units
+from .pricing import check_total, price_bookings
+
+# Every bookable holds one booking per day: the booking_no_overlap exclusion constraint
+# (migration 0014) enforces that on Postgres, so there is no capacity to pass around.
+# Checks read the AvailabilityCalendar rows (catalog.occupancy), never the Booking table.
+
+
+class BookingUnavailable(Exception):
+    pass
+
+
+def _check_range(start, end):
+    if not start < end:
+        raise ValueError("Booking range must satisfy start < end (end is exclusive).")
+
+
+def is_available(obj, start, end) -> bool:
+    _check_range(start, end)
+    return not any(booked_units(obj, start, end))
+
+
+def free_among(model, object_ids, start, end) -> set:
+    """Which of `object_ids` are free for all of [start, end) — one query for any number of ids."""
+    _check_range(start, end)
+    object_ids = list(object_ids)
+    ct = ContentType.objects.get_for_model(model)
+    return set(object_ids) - booked_objects(ct, object_ids, start, end)
+
+
+def create_booking(obj, buyer, start, end, total_price=None) -> Booking:
+    """
+    Book `obj` or raise BookingUnavailable. The bookable row is locked while its calendar is
+    checked; on Postgres the booking_no_overlap exclusion constraint is the final guard.
+
+    `total_price` defaults to the computed price and raises PriceMismatch if it disagrees.
+    """
+    _check_range(start, end)
+    booking = Booking(bookable=obj, buyer=buyer, start_date=start, end_date=end)
+    booking.total_price = check_total(price_bookings([booking])[0], total_price)
+    if booking.total_price is None:
+        raise ValueError(f"{obj} has no price; pass total_price explicitly.")
+    with transaction.atomic():
+        list(type(obj).objects.select_for_update().filter(pk=obj.pk).values_list("pk", flat=True))
+        if not is_available(obj, start, end):
+            raise BookingUnavailable(f"{obj} is not available from {start} to {end}.")
+        try:
+            with transaction.atomic():
+                booking.save(force_insert=True)
+                return booking
+        except IntegrityError as e:
+            raise BookingUnavailable(f"{obj} was booked concurrently from {start} to {end}.") from e
@@ -0,0 +1,68 @@
+# catalog/categories.py
+import threading
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = "catalog:category-tree:version"
+TREE_KEY = "catalog:category-tree:{version}"
+TREE_TTL = 60 * 60 * 24
+
+_local = threading.local()
+
+
+class CategoryTree:
+    """Whole Category table as a parent/child structure; nodes are Category instances with `tree_children`."""
+
+    def __init__(self, categories):
+        self.nodes = {c.pk: c for c in categories}
+        self.by_path = {c.path: c for c in categories}
+        self.roots = []
+        for c in categories:
+            c.tree_children = []
+        for c in categories:
+            parent = self.nodes.get(c.parent_id)
+            (parent.tree_children if parent else self.roots).append(c)
+
+    def resolve(self, path: str):
+        """Category for a URL path like "cars/suv", or None."""
+        return self.by_path.get(f"{path.strip('/')}/")
+
+    def children(self, category_id) -> list:
+        node = self.nodes.get(category_id)
+        return node.tree_children if node else []
+
+
+def tree_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # time-seeded so a flushed cache never reuses a version a process still holds
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_tree_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def build_tree() -> CategoryTree:
+    from .models import Category
+
+    return CategoryTree(list(Category.objects.order_by("name")))
+
+
+def get_category_tree() -> CategoryTree:
+    version = tree_version()
+    if getattr(_local, "version", None) == version:
+        return _local.tree
+    key = TREE_KEY.format(version=version)
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_tree()
+        cache.set(key, tree, TREE_TTL)
+    _local.version, _local.tree = version, tree
+    return tree
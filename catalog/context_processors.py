@@ -1,10 +1,12 @@
 # catalog/context_processors.py
-from .models import Category
+from django.utils.functional import SimpleLazyObject
+from .categories import get_category_tree
 
 def catalog_nav(request):
-    roots = Category.objects.select_related("parent").filter(parent__isnull=True).order_by("name")
+    # lazy: pages that never render the navbar don't touch the cache or the DB
     return {
-        "catalog_root_categories": roots,
+        "catalog_category_tree": SimpleLazyObject(get_category_tree),
+        "catalog_root_categories": SimpleLazyObject(lambda: get_category_tree().roots),
         "catalog_quick_types": [
             ("PRODUCT", "Products"),
             ("SERVICE", "Services"),
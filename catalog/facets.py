@@ -0,0 +1,134 @@
+# catalog/facets.py
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Q
+from django.utils.translation import gettext_lazy as _
+
+from .models import Car
+
+FACET_LIMIT = 30
+MAX_NUMBER = Decimal(10) ** 12  # larger bounds overflow integer columns instead of filtering
+
+# name -> (model field, label, choices enum or None)
+CHOICE_FACETS = {
+    "make": ("make", _("Make"), None),
+    "model": ("model", _("Model"), None),
+    "fuel_type": ("fuel_type", _("Fuel type"), Car.Fuel),
+    "transmission": ("transmission", _("Transmission"), Car.Transmission),
+    "condition": ("condition", _("Condition"), Car.Condition),
+}
+
+# name -> (model field, label, bucket boundaries, step); buckets are [lo, hi), the *_max param is inclusive
+RANGE_FACETS = {
+    "year": ("year", _("Year"), [2000, 2010, 2015, 2020], 1),
+    "mileage": ("mileage_km", _("Mileage (km)"), [20000, 50000, 100000, 150000], 1),
+    "price": ("price", _("Price"), [5000, 10000, 20000, 40000], Decimal("0.01")),
+}
+
+
+def _number(raw):
+    if raw in (None, ""):
+        return None
+    try:
+        value = Decimal(raw)
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    # NaN/sNaN/Infinity and huge values would raise in the filters instead of matching nothing
+    return value if value.is_finite() and abs(value) < MAX_NUMBER else None
+
+
+class CarFacets:
+    """
+    Filters and facet counts for CAR listings. Each facet is counted against every
+    filter except its own (so sibling values stay selectable): one GROUP BY per
+    choice facet and one conditional aggregate per range facet.
+    """
+
+    def __init__(self, params, listings):
+        self.params = params
+        self.listings = listings
+        self.choices = {name: [v for v in params.getlist(name) if v] for name in CHOICE_FACETS}
+        self.ranges = {
+            name: (_number(params.get(f"{name}_min")), _number(params.get(f"{name}_max")))
+            for name in RANGE_FACETS
+        }
+
+    def _q(self, exclude=None) -> Q:
+        q = Q()
+        for name, (field, _label, _enum) in CHOICE_FACETS.items():
+            if name != exclude and self.choices[name]:
+                q &= Q(**{f"{field}__in": self.choices[name]})
+        for name, (field, *_rest) in RANGE_FACETS.items():
+            lo, hi = self.ranges[name]
+            if name == exclude:
+                continue
+            if lo is not None:
+                q &= Q(**{f"{field}__gte": lo})
+            if hi is not None:
+                q &= Q(**{f"{field}__lte": hi})
+        return q
+
+    def base_cars(self):
+        return Car.objects.filter(is_active=True, pk__in=self.listings.order_by().values("object_id"))
+
+    def filter_listings(self, qs):
+        return qs.filter(object_id__in=self.base_cars().filter(self._q()).values("pk"))
+
+    def _url(self, **changes) -> str:
+        params = self.params.copy()
+        params.pop("cursor", None)
+        for key, value in changes.items():
+            if value is None:
+                params.pop(key, None)
+            elif isinstance(value, list):
+                params.setlist(key, value)
+            else:
+                params[key] = str(value)
+        return f"?{params.urlencode()}"
+
+    def _choice_facet(self, name):
+        field, label, enum = CHOICE_FACETS[name]
+        rows = (
+            self.base_cars().filter(self._q(exclude=name)).exclude(**{field: ""})
+            .values(field).annotate(n=Count("pk")).order_by("-n", field)[:FACET_LIMIT]
+        )
+        selected = self.choices[name]
+        options = []
+        for row in rows:
+            value = row[field]
+            toggled = [v for v in selected if v != value] if value in selected else [*selected, value]
+            options.append({
+                "label": enum(value).label if enum and value in enum.values else value,
+                "count": row["n"],
+                "selected": value in selected,
+                "url": self._url(**{name: toggled}),
+            })
+        return {"name": name, "label": label, "options": options}
+
+    def _range_facet(self, name):
+        field, label, bounds, step = RANGE_FACETS[name]
+        edges = [None, *bounds, None]
+        buckets = list(zip(edges, edges[1:]))
+        aggregates = {}
+        for i, (lo, hi) in enumerate(buckets):
+            cond = Q()
+            if lo is not None:
+                cond &= Q(**{f"{field}__gte": lo})
+            if hi is not None:
+                cond &= Q(**{f"{field}__lt": hi})
+            aggregates[f"b{i}"] = Count("pk", filter=cond)
+        counts = self.base_cars().filter(self._q(exclude=name)).aggregate(**aggregates)
+        current = self.ranges[name]
+        options = []
+        for i, (lo, hi) in enumerate(buckets):
+            hi_incl = hi - step if hi is not None else None
+            options.append({
+                "label": f"{lo if lo is not None else ''}–{hi_incl if hi_incl is not None else ''}",
+                "count": counts[f"b{i}"],
+                "selected": current == (lo, hi_incl),
+                "url": self._url(**{f"{name}_min": lo, f"{name}_max": hi_incl}),
+            })
+        return {"name": name, "label": label, "options": options}
+
+    def counts(self) -> list:
+        return [self._choice_facet(n) for n in CHOICE_FACETS] + [self._range_facet(n) for n in RANGE_FACETS]
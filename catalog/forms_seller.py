@@ -87,6 +87,45 @@ ProductLineFormSet = formset_factory(
 )
 
 
+# ---------- Bulk product import (CSV/XLSX) ----------
+class ProductImportRowForm(ProductLineForm):
+    """One spreadsheet row: ProductLineForm rules plus variant and stock columns."""
+    sku = forms.CharField(max_length=64, required=False)
+    variant_sku = forms.CharField(max_length=64, required=False)
+    variant_price = forms.DecimalField(max_digits=10, decimal_places=2, required=False)
+    quantity = forms.IntegerField(min_value=0, required=False)
+
+
+class ProductImportForm(forms.Form):
+    file = forms.FileField(
+        label=_("CSV or XLSX file"),
+        help_text=_("Columns: name, sku, price, color, size, variant_sku, variant_price, quantity"),
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.xlsx"}),
+    )
+
+
+# ---------- Service request inbox ----------
+class ServiceRequestActionForm(forms.Form):
+    ACTIONS = [("quote", _("Send quote")), ("reject", _("Reject"))]
+
+    request_id = forms.IntegerField(widget=forms.HiddenInput)
+    version = forms.IntegerField(widget=forms.HiddenInput)
+    action = forms.ChoiceField(choices=ACTIONS)
+    quoted_price = forms.DecimalField(
+        label=_("Quote"), max_digits=10, decimal_places=2, min_value=0, required=False,
+        widget=forms.NumberInput(attrs={"class": "form-control form-control-sm", "step": "0.01"}),
+    )
+    estimated_days = forms.IntegerField(
+        label=_("Days"), min_value=1, required=False,
+        widget=forms.NumberInput(attrs={"class": "form-control form-control-sm"}),
+    )
+
+    def clean(self):
+        data = super().clean()
+        if data.get("action") == "quote" and data.get("quoted_price") is None:
+            self.add_error("quoted_price", _("Enter a price to send a quote."))
+        return data
+
 
 # ---------- Service ----------
 class ServiceForm(forms.ModelForm):
@@ -0,0 +1,91 @@
+# catalog/geo.py
+import math
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 16
+NEAR_ORDERING = ("distance_km", "id")
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi, lng_lo, lng_hi = -90.0, 90.0, -180.0, 180.0
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            ch = (ch << 1) | (lng >= mid)
+            lng_lo, lng_hi = (mid, lng_hi) if lng >= mid else (lng_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            ch = (ch << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def cell_size(precision: int):
+    """(lat height, lng width) in degrees of a geohash cell."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def cover_cells(south, west, north, east) -> list:
+    """Geohash prefixes covering a bounding box: the finest precision that needs at most MAX_COVER_CELLS."""
+    south, north = max(-90.0, south), min(90.0, north)
+    west, east = max(-180.0, west), min(180.0, east)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        h, w = cell_size(precision)
+        rows = math.floor((north + 90) / h) - math.floor((south + 90) / h) + 1
+        cols = math.floor((east + 180) / w) - math.floor((west + 180) / w) + 1
+        if rows * cols <= MAX_COVER_CELLS:
+            # one sample per row/column step (plus the far edges) hits every covering cell
+            lats = [south + r * h for r in range(rows)] + [north]
+            lngs = [west + c * w for c in range(cols)] + [east]
+            return sorted({geohash_encode(min(a, north), min(b, east), precision) for a in lats for b in lngs})
+    return []  # whole world: no pruning
+
+
+def bbox_around(lat: float, lng: float, radius_km: float):
+    dlat = radius_km / KM_PER_DEG_LAT
+    dlng = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+
+def cells_q(cells) -> Q:
+    q = Q()
+    for cell in cells:
+        q |= Q(geohash__startswith=cell)
+    return q
+
+
+def bbox_q(south, west, north, east) -> Q:
+    return cells_q(cover_cells(south, west, north, east)) & Q(
+        lat__gte=south, lat__lte=north, lng__gte=west, lng__lte=east
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_expression(lat: float, lng: float):
+    """SQL twin of haversine_km() against the row's lat/lng."""
+    row_lat = Radians(Cast(F("lat"), FloatField()))
+    row_lng = Radians(Cast(F("lng"), FloatField()))
+    lat_r = Value(math.radians(lat), output_field=FloatField())
+    lng_r = Value(math.radians(lng), output_field=FloatField())
+    a = Power(Sin((row_lat - lat_r) / 2), 2) + Cos(lat_r) * Cos(row_lat) * Power(Sin((row_lng - lng_r) / 2), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
@@ -0,0 +1,197 @@
+# catalog/importers.py
+import codecs
+import csv
+import io
+import zipfile
+from pathlib import Path
+
+from django.db import transaction
+
+from .forms_seller import ProductImportRowForm
+from .models import Inventory, Product, ProductVariant, refresh_product_listings
+
+try:
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:
+    openpyxl = None  # XLSX uploads disabled; CSV still works
+    InvalidFileException = ValueError
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+COLUMNS = ["name", "sku", "price", "color", "size", "variant_sku", "variant_price", "quantity"]
+
+
+class ImportFileError(Exception):
+    pass
+
+
+def _check_utf8(fileobj) -> None:
+    """Decode the whole upload once (streaming) so a bad byte fails before any batch is written."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        for block in iter(lambda: fileobj.read(64 * 1024), b""):
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFileError(f"The CSV file is not UTF-8 encoded (byte {e.start}); save it as UTF-8 and retry.") from e
+    fileobj.seek(0)
+
+
+def _csv_rows(fileobj):
+    text = fileobj if isinstance(fileobj, io.TextIOBase) else io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.DictReader(text):
+            yield {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+    except csv.Error as e:
+        raise ImportFileError(f"The CSV file could not be read: {e}") from e
+
+
+def _open_xlsx(fileobj):
+    if openpyxl is None:
+        raise ImportFileError("XLSX import needs openpyxl; upload a CSV instead.")
+    try:
+        return openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as e:
+        raise ImportFileError("The XLSX file is damaged or not an Excel workbook.") from e
+
+
+def _xlsx_rows(wb):
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, [])]
+        for values in rows:
+            yield {h: "" if v is None else str(v).strip() for h, v in zip(header, values)}
+    finally:
+        wb.close()
+
+
+def iter_rows(fileobj, filename: str):
+    """
+    Stream dict rows from a CSV or XLSX file without loading it whole. Encoding and container
+    errors raise ImportFileError here, before the importer commits its first batch.
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        if not isinstance(fileobj, io.TextIOBase):
+            _check_utf8(fileobj)
+        return _csv_rows(fileobj)
+    if suffix in (".xlsx", ".xlsm"):
+        return _xlsx_rows(_open_xlsx(fileobj))
+    raise ImportFileError(f"Unsupported file type {suffix or '(none)'}; use .csv or .xlsx.")
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []  # (row number, message), capped so memory stays flat
+
+    def error(self, row_no: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_no, message))
+
+
+class ProductImporter:
+    """
+    Validates rows with ProductLineForm rules and upserts Product, ProductVariant and
+    Inventory by SKU, BATCH_SIZE rows per transaction. bulk_create sends no signals, so
+    listings of the touched products' groups are re-indexed per batch.
+    """
+
+    def __init__(self, vendor, batch_size=BATCH_SIZE):
+        self.vendor = vendor
+        self.batch_size = batch_size
+        self.result = ImportResult()
+
+    def run(self, rows) -> ImportResult:
+        batch, batch_skus = [], set()
+        for row_no, row in enumerate(rows, start=2):  # row 1 is the header
+            if not any(row.values()):
+                continue
+            form = ProductImportRowForm(data=row)
+            if not form.is_valid():
+                msgs = "; ".join(f"{field}: {' '.join(errs)}" for field, errs in form.errors.items())
+                self.result.error(row_no, msgs)
+                continue
+            data = form.cleaned_data
+            data["sku"] = data["sku"] or data["variant_sku"]
+            if not data["sku"]:
+                self.result.error(row_no, "sku: An item code is required for import.")
+                continue
+            data["variant_sku"] = data["variant_sku"] or data["sku"]
+            # one upsert statement cannot touch a key twice: flush before a repeat
+            keys = {("p", data["sku"]), ("v", data["variant_sku"])}
+            if keys & batch_skus or len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch, batch_skus = [], set()
+            batch.append((row_no, data))
+            batch_skus |= keys
+        self._flush(batch)
+        return self.result
+
+    def _flush(self, batch) -> None:
+        if not batch:
+            return
+        # ownership check and upsert share a transaction so a SKU cannot change hands in between
+        with transaction.atomic():
+            batch = self._drop_foreign(batch)
+            if not batch:
+                return
+            refresh_product_listings(self._upsert(batch))
+        self.result.imported += len(batch)
+
+    def _drop_foreign(self, batch):
+        """SKUs are global; refuse to overwrite another vendor's product or variant."""
+        product_owner = dict(
+            Product.objects.filter(sku__in={d["sku"] for _, d in batch}).values_list("sku", "vendor_id")
+        )
+        variant_owner = dict(
+            ProductVariant.objects.filter(sku__in={d["variant_sku"] for _, d in batch})
+            .values_list("sku", "product__vendor_id")
+        )
+        kept = []
+        for row_no, d in batch:
+            if product_owner.get(d["sku"], self.vendor.pk) != self.vendor.pk:
+                self.result.error(row_no, f"sku: {d['sku']} belongs to another store.")
+            elif variant_owner.get(d["variant_sku"], self.vendor.pk) != self.vendor.pk:
+                self.result.error(row_no, f"variant_sku: {d['variant_sku']} belongs to another store.")
+            else:
+                kept.append((row_no, d))
+        return kept
+
+    def _upsert(self, batch) -> list:
+        """Write one batch; returns the ids of the products it touched."""
+        Product.objects.bulk_create(
+            [
+                Product(vendor=self.vendor, name=d["name"], sku=d["sku"], base_price=d["price"])
+                for _, d in batch
+            ],
+            update_conflicts=True, unique_fields=["sku"], update_fields=["name", "base_price"],
+        )
+        product_ids = dict(Product.objects.filter(sku__in=[d["sku"] for _, d in batch]).values_list("sku", "id"))
+
+        ProductVariant.objects.bulk_create(
+            [
+                ProductVariant(
+                    product_id=product_ids[d["sku"]],
+                    sku=d["variant_sku"],
+                    price=d["variant_price"] if d["variant_price"] is not None else d["price"],
+                    options={k: d[k] for k in ("color", "size") if d[k]},
+                )
+                for _, d in batch
+            ],
+            update_conflicts=True, unique_fields=["sku"], update_fields=["product", "price", "options"],
+        )
+        stocked = [d for _, d in batch if d["quantity"] is not None]
+        if not stocked:
+            return list(product_ids.values())
+        variant_ids = dict(
+            ProductVariant.objects.filter(sku__in=[d["variant_sku"] for d in stocked]).values_list("sku", "id")
+        )
+        Inventory.objects.bulk_create(
+            [Inventory(variant_id=variant_ids[d["variant_sku"]], quantity=d["quantity"]) for d in stocked],
+            update_conflicts=True, unique_fields=["variant"], update_fields=["quantity"],
+        )
+        return list(product_ids.values())
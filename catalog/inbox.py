@@ -0,0 +1,78 @@
+# catalog/inbox.py
+from django.db import transaction
+from django.db.models import F
+
+from .models import ServiceInboxCounter, ServiceRequest
+from .pagination import PAGE_SIZE, keyset_paginate
+
+INBOX_STATUSES = [s for s, _label in ServiceRequest.STATUS_CHOICES]
+
+
+class StaleRequest(Exception):
+    """The request changed since it was loaded (someone else acted on it first)."""
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def inbox_page(vendor, status=ServiceRequest.PENDING, cursor=None, per_page=PAGE_SIZE):
+    """Newest-first page of one status queue; served by the (service, status, -created_at, -id) index."""
+    qs = ServiceRequest.objects.for_vendor(vendor).filter(status=status).select_related("service", "buyer")
+    return keyset_paginate(qs, cursor, per_page=per_page)
+
+
+def inbox_counts(vendor) -> dict:
+    """{status: (total, unread)} for every status, from the counter rows (no COUNT(*) over requests)."""
+    counts = {s: (0, 0) for s in INBOX_STATUSES}
+    for status, total, unread in vendor.inbox_counters.values_list("status", "total", "unread"):
+        counts[status] = (total, unread)
+    return counts
+
+
+def mark_read(vendor, requests) -> int:
+    """Flag the given requests as read and move them out of the unread counters."""
+    ids = [r.pk for r in requests if not r.is_read]
+    if not ids:
+        return 0
+    with transaction.atomic():
+        unread = (
+            ServiceRequest.objects.for_vendor(vendor).filter(pk__in=ids, is_read=False)
+            .select_for_update(of=("self",))  # not the joined Service rows
+        )
+        by_status = {}
+        for status in unread.values_list("status", flat=True):
+            by_status[status] = by_status.get(status, 0) + 1
+        marked = ServiceRequest.objects.filter(pk__in=ids, is_read=False).update(is_read=True)
+        for status, n in by_status.items():
+            ServiceInboxCounter.apply(vendor.pk, status, unread=-n)
+    for r in requests:
+        r.is_read = True
+        r._loaded_inbox = r.inbox_key()
+    return marked
+
+
+def transition(request_obj, to_status, **fields) -> ServiceRequest:
+    """
+    Move `request_obj` to `to_status` if nobody changed it since it was loaded.
+
+    The UPDATE matches on the loaded `version` and status, so of two concurrent actors only
+    the first wins; the other gets StaleRequest and should reload. Counters move in the
+    same transaction.
+    """
+    if to_status not in ServiceRequest.TRANSITIONS.get(request_obj.status, ()):
+        raise InvalidTransition(f"Cannot move a {request_obj.status} request to {to_status}.")
+    old = request_obj.inbox_key()
+    with transaction.atomic():
+        updated = ServiceRequest.objects.filter(
+            pk=request_obj.pk, version=request_obj.version, status=request_obj.status,
+        ).update(status=to_status, version=F("version") + 1, **fields)
+        if not updated:
+            raise StaleRequest(f"Request #{request_obj.pk} was changed by someone else.")
+        request_obj.status = to_status
+        request_obj.version += 1
+        for name, value in fields.items():
+            setattr(request_obj, name, value)
+        ServiceInboxCounter.apply_keys(old, request_obj.inbox_key())
+        request_obj._loaded_inbox = request_obj.inbox_key()
+    return request_obj
@@ -0,0 +1,69 @@
+# catalog/inventory.py
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Inventory, StockReservation
+
+RESERVATION_TTL = timedelta(minutes=15)
+
+
+class InsufficientStock(Exception):
+    def __init__(self, variant_id, requested):
+        super().__init__(f"Not enough stock for variant {variant_id} (requested {requested})")
+        self.variant_id = variant_id
+        self.requested = requested
+
+
+def reserve(items, ttl=RESERVATION_TTL):
+    """
+    Take stock for {variant_id: quantity} all-or-nothing and return a reservation token.
+
+    Each variant is decremented with a conditional UPDATE (quantity >= n), so concurrent
+    checkouts can never oversell; no lock outlives this call.
+    """
+    items = {int(v): int(n) for v, n in dict(items).items() if int(n) > 0}
+    token = uuid.uuid4()
+    expires_at = timezone.now() + ttl
+    with transaction.atomic():
+        # fixed order keeps concurrent multi-variant reservations from deadlocking
+        for variant_id in sorted(items):
+            n = items[variant_id]
+            took = Inventory.objects.filter(variant_id=variant_id, quantity__gte=n).update(quantity=F("quantity") - n)
+            if not took:
+                raise InsufficientStock(variant_id, n)
+        StockReservation.objects.bulk_create([
+            StockReservation(token=token, variant_id=v, quantity=n, expires_at=expires_at)
+            for v, n in items.items()
+        ])
+    return token
+
+
+def commit(token) -> int:
+    """Turn held units into a sale; returns how many reservation rows were committed."""
+    return StockReservation.objects.filter(
+        token=token, status=StockReservation.HELD, expires_at__gt=timezone.now()
+    ).update(status=StockReservation.COMMITTED)
+
+
+def _give_back(reservations) -> int:
+    released = 0
+    for r in reservations:
+        # only the caller that flips HELD -> RELEASED restores stock
+        with transaction.atomic():
+            if StockReservation.objects.filter(pk=r.pk, status=StockReservation.HELD).update(status=StockReservation.RELEASED):
+                Inventory.objects.filter(variant_id=r.variant_id).update(quantity=F("quantity") + r.quantity)
+                released += 1
+    return released
+
+
+def release(token) -> int:
+    return _give_back(StockReservation.objects.filter(token=token, status=StockReservation.HELD))
+
+
+def expire_stale(now=None) -> int:
+    now = now or timezone.now()
+    return _give_back(StockReservation.objects.filter(status=StockReservation.HELD, expires_at__lte=now))
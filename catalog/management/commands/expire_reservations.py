@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from catalog.inventory import expire_stale
+
+
+class Command(BaseCommand):
+    help = "Return stock held by expired, uncommitted reservations (run from cron every few minutes)."
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"Released {expire_stale()} expired reservations.")
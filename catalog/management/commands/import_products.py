@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from catalog.importers import BATCH_SIZE, ImportFileError, ProductImporter, iter_rows
+from profiles.models import Vendor
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV/XLSX file of products into a vendor's catalog, upserting by SKU."
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendor", help="Vendor slug")
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **opts):
+        try:
+            vendor = Vendor.objects.get(slug=opts["vendor"])
+        except Vendor.DoesNotExist:
+            raise CommandError(f"No vendor with slug {opts['vendor']!r}")
+
+        path = opts["path"]
+        try:
+            with open(path, "rb") as fh:
+                result = ProductImporter(vendor, batch_size=opts["batch_size"]).run(iter_rows(fh, path))
+        except (ImportFileError, OSError) as e:
+            raise CommandError(str(e))
+
+        for row_no, message in result.errors:
+            self.stderr.write(f"row {row_no}: {message}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f"... {result.failed - len(result.errors)} more rejected rows not shown")
+        self.stdout.write(f"Imported {result.imported} rows, rejected {result.failed}.")
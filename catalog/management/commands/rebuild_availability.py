@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from catalog.models import Booking
+from catalog.occupancy import rebuild
+from django.contrib.contenttypes.models import ContentType
+
+
+class Command(BaseCommand):
+    help = "Recompute per-day availability calendars from Booking rows for every booked object."
+
+    def handle(self, *args, **opts):
+        pairs = Booking.objects.values_list("content_type_id", "object_id").distinct()
+        total = 0
+        for ct_id, object_id in pairs.iterator():
+            rebuild(ContentType.objects.get_for_id(ct_id), object_id)
+            total += 1
+        self.stdout.write(f"Rebuilt availability calendars for {total} objects.")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from catalog.models import Listing, refresh_listing_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild denormalized Listing search/browse columns for every listing (after deploys or bulk edits)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        size = opts["batch_size"]
+        qs = Listing.objects.select_related("vendor", "category").with_content_objects().order_by("pk")
+        last_pk, total = 0, 0
+        while True:
+            batch = list(qs.filter(pk__gt=last_pk)[:size])
+            if not batch:
+                break
+            refresh_listing_index(batch)
+            last_pk = batch[-1].pk
+            total += len(batch)
+        self.stdout.write(f"Rebuilt listing index for {total} listings.")
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:36
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# Must stay in sync with the SearchVector built in catalog.search._search_postgres.
+SEARCH_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS catalog_listing_search_gin ON catalog_listing "
+    "USING gin (to_tsvector('simple'::regconfig, COALESCE(search_document, '')))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(SEARCH_INDEX_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS catalog_listing_search_gin")
+
+
+def _search_terms(obj) -> list:
+    # historical models have no methods: mirrors the search_terms() of each bookable type
+    name = obj._meta.model_name
+    if name == "productgroup":
+        return [obj.title, obj.description, *(p.name for p in obj.products.all())]
+    if name == "service":
+        return [obj.name, obj.service_area, *obj.skills]
+    if name == "car":
+        return [obj.make, obj.model, obj.year, obj.body_type, obj.color, obj.description]
+    if name == "property":
+        return [obj.title, obj.address, obj.city, obj.postal_code, obj.country and obj.country.name]
+    return []
+
+
+def fill_search_documents(apps, schema_editor, batch_size=500):
+    """Build search_document for existing listings (later edits keep it current via signals)."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Listing = apps.get_model("catalog", "Listing")
+    qs = Listing.objects.select_related("vendor", "category").order_by("pk")
+    last_pk = 0
+    while batch := list(qs.filter(pk__gt=last_pk)[:batch_size]):
+        ids = defaultdict(set)
+        for listing in batch:
+            ids[listing.content_type_id].add(listing.object_id)
+        objects = {}
+        for ct in ContentType.objects.filter(pk__in=ids):
+            try:
+                model = apps.get_model(ct.app_label, ct.model)
+            except LookupError:
+                continue
+            rows = model.objects.filter(pk__in=ids[ct.pk])
+            if ct.model == "productgroup":
+                rows = rows.prefetch_related("products")
+            objects.update({(ct.pk, obj.pk): obj for obj in rows})
+        for listing in batch:
+            obj = objects.get((listing.content_type_id, listing.object_id))
+            parts = [listing.title, listing.teaser, listing.category.name, listing.vendor.display_name]
+            parts += _search_terms(obj) if obj is not None else []
+            listing.search_document = " ".join(str(p) for p in parts if p)
+        Listing.objects.bulk_update(batch, ["search_document"])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0006_remove_room_vendor_property_country_property_floor_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="search_document",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Search document"
+            ),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
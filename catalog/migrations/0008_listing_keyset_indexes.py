@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0007_listing_search_document"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("profiles", "0004_userprofile_is_seller_userprofile_kyc_approved_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["is_active", "-created_at", "-id"],
+                name="catalog_lis_is_acti_4ffac8_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category", "is_active", "-created_at", "-id"],
+                name="catalog_lis_categor_116e24_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["vendor", "-created_at", "-id"],
+                name="catalog_lis_vendor__af684c_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:52
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    rows = {c.pk: c for c in Category.objects.all()}
+
+    def path_of(c):
+        if not c.path:
+            parent = rows.get(c.parent_id)
+            c.path = f"{path_of(parent) if parent else ''}{c.slug}/"
+        return c.path
+
+    for c in rows.values():
+        path_of(c)
+    Category.objects.bulk_update(rows.values(), ["path"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0008_listing_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                default="", editable=False, max_length=255, verbose_name="Path"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                editable=False, max_length=255, unique=True, verbose_name="Path"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0009_category_path"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("profiles", "0004_userprofile_is_seller_userprofile_kyc_approved_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["is_active", "make", "model"],
+                name="catalog_car_is_acti_532219_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["is_active", "price"], name="catalog_car_is_acti_4bcf9e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["is_active", "year"], name="catalog_car_is_acti_65a37f_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["is_active", "mileage_km"],
+                name="catalog_car_is_acti_c7fc34_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["fuel_type", "transmission", "condition"],
+                name="catalog_car_fuel_ty_fd8cf2_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["content_type", "object_id"],
+                name="catalog_lis_content_cdfe29_idx",
+            ),
+        ),
+    ]
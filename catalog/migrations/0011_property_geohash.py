@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:43
+
+from django.db import migrations, models
+
+from catalog.geo import geohash_encode
+
+
+def populate_geohash(apps, schema_editor):
+    Property = apps.get_model("catalog", "Property")
+    rows = list(Property.objects.filter(lat__isnull=False, lng__isnull=False))
+    for p in rows:
+        p.geohash = geohash_encode(float(p.lat), float(p.lng))
+    Property.objects.bulk_update(rows, ["geohash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0010_car_facet_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="property",
+            name="geohash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=12,
+                verbose_name="Geohash",
+            ),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:44
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def _browse_values(obj) -> dict:
+    # historical models have no methods: mirrors the browse_values() of each bookable type
+    name = obj._meta.model_name
+    if name == "productgroup":
+        prices = [p.base_price for p in obj.products.all() if p.base_price is not None]
+        return {"price": min(prices, default=None)}
+    if name == "service":
+        if obj.pricing_type == "FIXED":
+            return {"price": obj.base_fixed_price}
+        return {"price": obj.hourly_rate if obj.hourly_rate is not None else obj.base_fixed_price}
+    if name == "car":
+        return {"price": obj.price, "year": obj.year}
+    if name == "property":
+        price = obj.monthly_rent if obj.purpose == "RENT" else obj.sale_price
+        return {"price": price, "city": obj.city, "year": obj.year_built, "bedrooms": obj.bedrooms}
+    return {}
+
+
+def fill_browse_columns(apps, schema_editor, batch_size=500):
+    """Copy price/city/year/bedrooms onto existing listings (later edits keep them current via signals)."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Listing = apps.get_model("catalog", "Listing")
+    qs = Listing.objects.order_by("pk")
+    last_pk = 0
+    while batch := list(qs.filter(pk__gt=last_pk)[:batch_size]):
+        ids = defaultdict(set)
+        for listing in batch:
+            ids[listing.content_type_id].add(listing.object_id)
+        objects = {}
+        for ct in ContentType.objects.filter(pk__in=ids):
+            try:
+                model = apps.get_model(ct.app_label, ct.model)
+            except LookupError:
+                continue
+            rows = model.objects.filter(pk__in=ids[ct.pk])
+            if ct.model == "productgroup":
+                rows = rows.prefetch_related("products")
+            objects.update({(ct.pk, obj.pk): obj for obj in rows})
+        for listing in batch:
+            obj = objects.get((listing.content_type_id, listing.object_id))
+            values = {"price": None, "city": "", "year": None, "bedrooms": None}
+            values.update(_browse_values(obj) if obj is not None else {})
+            for field, value in values.items():
+                setattr(listing, field, value)
+        Listing.objects.bulk_update(batch, ["price", "city", "year", "bedrooms"])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0011_property_geohash"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("profiles", "0004_userprofile_is_seller_userprofile_kyc_approved_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="bedrooms",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Bedrooms"
+            ),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="city",
+            field=models.CharField(
+                blank=True, editable=False, max_length=120, verbose_name="City"
+            ),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="price",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                max_digits=12,
+                null=True,
+                verbose_name="Price",
+            ),
+        ),
+        migrations.AddField(
+            model_name="listing",
+            name="year",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Year"
+            ),
+        ),
+        migrations.RunPython(fill_browse_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["is_active", "price", "id"],
+                name="catalog_lis_is_acti_f59f71_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["is_active", "city"], name="catalog_lis_is_acti_fdd924_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["is_active", "year"], name="catalog_lis_is_acti_21e800_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_listing_browse_columns"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.UUIDField(db_index=True, verbose_name="Token")),
+                ("quantity", models.PositiveIntegerField(verbose_name="Quantity")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("HELD", "Held"),
+                            ("COMMITTED", "Committed"),
+                            ("RELEASED", "Released"),
+                        ],
+                        default="HELD",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="Expires at")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "variant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="catalog.productvariant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Stock reservation",
+                "verbose_name_plural": "Stock reservations",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "expires_at"],
+                        name="catalog_sto_status_a1027a_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:31
+
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+# No two active bookings of the same object may share a day. Postgres only; other
+# backends rely on the row lock in catalog.availability.create_booking.
+#
+# btree_gist is a trusted extension (PostgreSQL 13+): the migrating role needs CREATE
+# on the database, or a superuser must run CREATE EXTENSION btree_gist beforehand.
+CREATE_SQL = """
+ALTER TABLE catalog_booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist (
+    content_type_id WITH =,
+    object_id WITH =,
+    daterange(start_date, end_date, '[)') WITH &&
+) WHERE (status IN ('PENDING', 'CONFIRMED'));
+"""
+
+
+def add_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE catalog_booking DROP CONSTRAINT IF EXISTS booking_no_overlap"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0013_stockreservation"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(add_exclusion, drop_exclusion),
+    ]
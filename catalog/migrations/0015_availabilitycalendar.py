@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:48
+
+from collections import defaultdict
+from datetime import timedelta
+
+import catalog.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_calendars(apps, schema_editor):
+    """Build calendar rows from existing active bookings (same arithmetic as AvailabilityCalendar.apply)."""
+    Booking = apps.get_model("catalog", "Booking")
+    AvailabilityCalendar = apps.get_model("catalog", "AvailabilityCalendar")
+    years = defaultdict(lambda: bytearray(366))
+    bookings = Booking.objects.filter(status__in=("PENDING", "CONFIRMED")).values_list(
+        "content_type_id", "object_id", "start_date", "end_date", "quantity"
+    )
+    for ct_id, object_id, start, end, quantity in bookings.iterator():
+        d = start
+        while d < end:
+            days = years[ct_id, object_id, d.year]
+            i = d.timetuple().tm_yday - 1
+            days[i] = min(days[i] + quantity, 255)
+            d += timedelta(days=1)
+    AvailabilityCalendar.objects.bulk_create(
+        [
+            AvailabilityCalendar(content_type_id=ct_id, object_id=object_id, year=year, days=bytes(days))
+            for (ct_id, object_id, year), days in years.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0014_booking_no_overlap"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AvailabilityCalendar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("year", models.PositiveSmallIntegerField(verbose_name="Year")),
+                (
+                    "days",
+                    models.BinaryField(
+                        default=catalog.models.empty_calendar_year,
+                        verbose_name="Booked units per day",
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Availability calendar",
+                "verbose_name_plural": "Availability calendars",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("content_type", "object_id", "year"),
+                        name="uniq_calendar_year",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_calendars, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_counters(apps, schema_editor):
+    ServiceRequest = apps.get_model("catalog", "ServiceRequest")
+    ServiceInboxCounter = apps.get_model("catalog", "ServiceInboxCounter")
+    rows = (
+        ServiceRequest.objects.values("service__vendor_id", "status")
+        .annotate(total=Count("id"), unread=Count("id", filter=Q(is_read=False)))
+    )
+    ServiceInboxCounter.objects.bulk_create([
+        ServiceInboxCounter(vendor_id=r["service__vendor_id"], status=r["status"], total=r["total"], unread=r["unread"])
+        for r in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0015_availabilitycalendar"),
+        ("profiles", "0004_userprofile_is_seller_userprofile_kyc_approved_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceInboxCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("QUOTED", "Quoted"),
+                            ("ACCEPTED", "Accepted"),
+                            ("REJECTED", "Rejected"),
+                            ("CANCELED", "Canceled"),
+                        ],
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("total", models.IntegerField(default=0, verbose_name="Requests")),
+                ("unread", models.IntegerField(default=0, verbose_name="Unread")),
+            ],
+            options={
+                "verbose_name": "Service inbox counter",
+                "verbose_name_plural": "Service inbox counters",
+            },
+        ),
+        migrations.AddField(
+            model_name="servicerequest",
+            name="is_read",
+            field=models.BooleanField(default=False, verbose_name="Read by vendor"),
+        ),
+        migrations.AddField(
+            model_name="servicerequest",
+            name="version",
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="servicerequest",
+            index=models.Index(
+                fields=["service", "status", "-created_at", "-id"],
+                name="catalog_ser_service_8e4d5a_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="serviceinboxcounter",
+            name="vendor",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="inbox_counters",
+                to="profiles.vendor",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="serviceinboxcounter",
+            constraint=models.UniqueConstraint(
+                fields=("vendor", "status"), name="uniq_inbox_counter"
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
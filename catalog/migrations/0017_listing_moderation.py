@@ -0,0 +1,99 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0016_service_request_inbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingListing",
+            fields=[],
+            options={
+                "verbose_name": "Pending listing",
+                "verbose_name_plural": "Moderation queue",
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("catalog.listing",),
+        ),
+        migrations.CreateModel(
+            name="ListingModeration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "from_status",
+                    models.CharField(
+                        choices=[
+                            ("DRAFT", "Draft"),
+                            ("PENDING", "Pending review"),
+                            ("PUBLISHED", "Published"),
+                            ("REJECTED", "Rejected"),
+                        ],
+                        max_length=12,
+                        verbose_name="From",
+                    ),
+                ),
+                (
+                    "to_status",
+                    models.CharField(
+                        choices=[
+                            ("DRAFT", "Draft"),
+                            ("PENDING", "Pending review"),
+                            ("PUBLISHED", "Published"),
+                            ("REJECTED", "Rejected"),
+                        ],
+                        max_length=12,
+                        verbose_name="To",
+                    ),
+                ),
+                ("notes", models.TextField(blank=True, verbose_name="Notes")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="By",
+                    ),
+                ),
+                (
+                    "listing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="moderations",
+                        to="catalog.listing",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Listing moderation",
+                "verbose_name_plural": "Listing moderations",
+                "indexes": [
+                    models.Index(
+                        fields=["listing", "-created_at"],
+                        name="catalog_lis_listing_1d7bc5_idx",
+                    )
+                ],
+            },
+        ),
+    ]
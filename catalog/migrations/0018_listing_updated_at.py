@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_updated_at(apps, schema_editor):
+    Listing = apps.get_model("catalog", "Listing")
+    Listing.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0017_listing_moderation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now, verbose_name="Updated at"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_updated_at, migrations.RunPython.noop),
+    ]
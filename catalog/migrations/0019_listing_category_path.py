@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:14
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_category_paths(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    Listing = apps.get_model("catalog", "Listing")
+    Listing.objects.update(
+        category_path=Subquery(Category.objects.filter(pk=OuterRef("category_id")).values("path")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0018_listing_updated_at"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("profiles", "0004_userprofile_is_seller_userprofile_kyc_approved_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="listing",
+            name="category_path",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, verbose_name="Category path"
+            ),
+        ),
+        migrations.RunPython(copy_category_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["category_path"],
+                name="listing_category_path_like",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0019_listing_category_path"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("profiles", "0004_userprofile_is_seller_userprofile_kyc_approved_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="listing",
+            name="catalog_lis_is_acti_f59f71_idx",
+        ),
+        migrations.AddIndex(
+            model_name="listing",
+            index=models.Index(
+                fields=["is_active", "currency", "price", "id"],
+                name="catalog_lis_is_acti_e16e85_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0020_listing_price_currency_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="listing",
+            name="catalog_lis_categor_116e24_idx",
+        ),
+    ]
@@ -1,11 +1,24 @@
+from datetime import date, timedelta
+
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from django.contrib.contenttypes.models import ContentType
 from django_countries.fields import CountryField
 
+from .categories import bump_tree_version
+from .snapshots import bump_listings_version
+from .geo import bbox_around, bbox_q, geohash_encode, haversine_expression, NEAR_ORDERING
+
 
 # ---------- Constants ----------
 CURRENCY_CHOICES = [
@@ -16,12 +29,17 @@ CURRENCY_CHOICES = [
 
 
 # ---------- Taxonomy ----------
+CATEGORY_MAX_DEPTH = 8
+
+
 class Category(models.Model):
     name = models.CharField(_("Name"), max_length=120)
     slug = models.SlugField(_("Slug"))
     parent = models.ForeignKey(
         "self", null=True, blank=True, related_name="children", on_delete=models.CASCADE
     )
+    # Materialized slug path, e.g. "cars/suv/"; a subtree is every row with this prefix.
+    path = models.CharField(_("Path"), max_length=255, unique=True, editable=False)
 
     class Meta:
         verbose_name = _("Category")
@@ -39,8 +57,76 @@ class Category(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if not {"name", "path"} & instance.get_deferred_fields():
+            instance._loaded_indexed = (instance.name, instance.path)
+        return instance
+
+    def get_absolute_url(self) -> str:
+        return reverse("catalog:category", args=[self.path.rstrip("/")])
+
+    def build_path(self) -> str:
+        return f"{self.parent.path if self.parent_id else ''}{self.slug}/"
+
+    def validate_placement(self) -> None:
+        """
+        Refuse parents that would make a cycle (self or a descendant) and moves that push any
+        path in the subtree past the column length or CATEGORY_MAX_DEPTH.
+        """
+        stored = Category.objects.filter(pk=self.pk).values_list("path", flat=True).first() if self.pk else None
+        subtree = [""]
+        if stored:
+            if self.parent_id == self.pk or (
+                self.parent_id and Category.objects.filter(pk=self.parent_id, path__startswith=stored).exists()
+            ):
+                raise ValidationError({"parent": _("A category cannot be moved under itself or one of its descendants.")})
+            subtree = [p[len(stored):] for p in Category.objects.filter(path__startswith=stored).values_list("path", flat=True)]
+        path = self.build_path()
+        max_length = self._meta.get_field("path").max_length
+        if len(path) + max(map(len, subtree)) > max_length:
+            raise ValidationError({"slug": _("The category path would exceed %(max)d characters.") % {"max": max_length}})
+        if path.count("/") + max(p.count("/") for p in subtree) > CATEGORY_MAX_DEPTH:
+            raise ValidationError({"parent": _("Categories cannot be nested more than %(max)d levels deep.") % {"max": CATEGORY_MAX_DEPTH}})
+
+    def clean(self):
+        super().clean()
+        self.validate_placement()
+
+    def save(self, *args, **kwargs):
+        self.validate_placement()
+        old_path, self.path = self.path, self.build_path()
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "path"}
+        super().save(*args, **kwargs)
+        if old_path and old_path != self.path:
+            # re-root descendants and their listings' copies, one UPDATE each
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(self.path), Substr("path", len(old_path) + 1))
+            )
+            Listing.objects.filter(category_path__startswith=old_path).update(
+                category_path=Concat(Value(self.path), Substr("category_path", len(old_path) + 1))
+            )
+
 
 # ---------- Marketplace wrapper ----------
+class ListingQuerySet(models.QuerySet):
+    def with_content_objects(self):
+        """Resolve `content_object` with one IN query per concrete type, plus their own relations."""
+        return self.prefetch_related(
+            GenericPrefetch(
+                "content_object",
+                [
+                    Car.objects.all(),
+                    Property.objects.all(),
+                    Service.objects.prefetch_related("packages"),
+                    ProductGroup.objects.prefetch_related("products"),
+                ],
+            )
+        )
+
+
 class Listing(models.Model):
     class Type(models.TextChoices):
         PRODUCT = "PRODUCT", _("Product")
@@ -83,6 +169,20 @@ class Listing(models.Model):
     content_object = GenericForeignKey("content_type", "object_id")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # version stamp for the detail page cache and conditional GETs; see touch_listings()
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+
+    objects = ListingQuerySet.as_manager()
+
+    # Denormalized from content_object and kept in sync by the signals at the bottom of this module:
+    # text behind ?q= (see catalog.search) and sortable/filterable browse attributes.
+    search_document = models.TextField(_("Search document"), blank=True, editable=False)
+    price = models.DecimalField(_("Price"), max_digits=12, decimal_places=2, null=True, blank=True, editable=False)
+    city = models.CharField(_("City"), max_length=120, blank=True, editable=False)
+    year = models.PositiveIntegerField(_("Year"), null=True, blank=True, editable=False)
+    bedrooms = models.PositiveIntegerField(_("Bedrooms"), null=True, blank=True, editable=False)
+    # copy of category.path: a category subtree is one prefix range on this table, no join
+    category_path = models.CharField(_("Category path"), max_length=255, blank=True, editable=False)
 
     class Meta:
         verbose_name = _("Listing")
@@ -93,11 +193,87 @@ class Listing(models.Model):
             models.Index(fields=["category"]),
             models.Index(fields=["vendor"]),
             models.Index(fields=["slug"]),
+            # keyset pagination on (created_at, id) for browse and seller views; category pages
+            # filter on the category_path prefix (listing_category_path_like below)
+            models.Index(fields=["is_active", "-created_at", "-id"]),
+            models.Index(fields=["vendor", "-created_at", "-id"]),
+            # generic FK lookups from the concrete side (facets, search refresh)
+            models.Index(fields=["content_type", "object_id"]),
+            # cross-type browse on denormalized attributes; prices only compare within a currency
+            models.Index(fields=["is_active", "currency", "price", "id"]),
+            models.Index(fields=["is_active", "city"]),
+            models.Index(fields=["is_active", "year"]),
+            # LIKE 'prefix%' on Postgres needs the pattern opclass (ignored elsewhere)
+            models.Index(fields=["category_path"], name="listing_category_path_like", opclasses=["varchar_pattern_ops"]),
         ]
 
+    # statuses each status may move to; see catalog.moderation
+    TRANSITIONS = {
+        Status.DRAFT: (Status.PENDING,),
+        Status.PENDING: (Status.PUBLISHED, Status.REJECTED),
+        Status.PUBLISHED: (Status.REJECTED,),
+        Status.REJECTED: (Status.DRAFT, Status.PENDING),
+    }
+
     def __str__(self) -> str:
         return f"{self.title} [{self.type}]"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "is_active" not in instance.get_deferred_fields():
+            instance._loaded_active = instance.is_active
+        return instance
+
+    def build_search_document(self) -> str:
+        parts = [self.title, self.teaser, self.category.name, self.vendor.display_name]
+        obj = self.content_object
+        if obj is not None and hasattr(obj, "search_terms"):
+            parts.extend(obj.search_terms())
+        return " ".join(str(p) for p in parts if p)
+
+    def index_values(self) -> dict:
+        values = {
+            "search_document": self.build_search_document(), "category_path": self.category.path,
+            "price": None, "city": "", "year": None, "bedrooms": None,
+        }
+        obj = self.content_object
+        if obj is not None and hasattr(obj, "browse_values"):
+            values.update(obj.browse_values())
+        # the listing's own country wins; otherwise inherit it from the object
+        values["country"] = self.country or values.get("country")
+        return values
+
+
+class PendingListing(Listing):
+    """Moderation queue: listings waiting for review, oldest submission first."""
+
+    class Meta:
+        proxy = True
+        verbose_name = _("Pending listing")
+        verbose_name_plural = _("Moderation queue")
+
+
+class ListingModeration(models.Model):
+    """Audit trail: one row per status change made through catalog.moderation."""
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name="moderations")
+    from_status = models.CharField(_("From"), max_length=12, choices=Listing.Status.choices)
+    to_status = models.CharField(_("To"), max_length=12, choices=Listing.Status.choices)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+        verbose_name=_("By"),
+    )
+    notes = models.TextField(_("Notes"), blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Listing moderation")
+        verbose_name_plural = _("Listing moderations")
+        indexes = [models.Index(fields=["listing", "-created_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.listing_id}: {self.from_status} → {self.to_status}"
+
 
 # ---------- Products ----------
 class Product(models.Model):
@@ -134,6 +310,13 @@ class ProductGroup(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    def search_terms(self) -> list:
+        return [self.title, self.description, *(p.name for p in self.products.all())]
+
+    def browse_values(self) -> dict:
+        prices = [p.base_price for p in self.products.all() if p.base_price is not None]
+        return {"price": min(prices, default=None)}
+
 
 class ProductVariant(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="variants")
@@ -161,6 +344,31 @@ class Inventory(models.Model):
         return f"{self.variant.sku}: {self.quantity}"
 
 
+class StockReservation(models.Model):
+    """Units taken out of Inventory.quantity for a checkout; see catalog.inventory."""
+    HELD, COMMITTED, RELEASED = ("HELD", "COMMITTED", "RELEASED")
+    STATUS_CHOICES = [
+        (HELD, _("Held")),
+        (COMMITTED, _("Committed")),
+        (RELEASED, _("Released")),
+    ]
+
+    token = models.UUIDField(_("Token"), db_index=True)
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name="reservations")
+    quantity = models.PositiveIntegerField(_("Quantity"))
+    status = models.CharField(_("Status"), max_length=10, choices=STATUS_CHOICES, default=HELD)
+    expires_at = models.DateTimeField(_("Expires at"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Stock reservation")
+        verbose_name_plural = _("Stock reservations")
+        indexes = [models.Index(fields=["status", "expires_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.token} {self.variant_id} x{self.quantity} [{self.status}]"
+
+
 # ---------- Services ----------
 class Service(models.Model):
     class PricingType(models.TextChoices):
@@ -192,6 +400,14 @@ class Service(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def search_terms(self) -> list:
+        return [self.name, self.service_area, *self.skills]
+
+    def browse_values(self) -> dict:
+        if self.pricing_type == self.PricingType.FIXED:
+            return {"price": self.base_fixed_price}
+        return {"price": self.hourly_rate if self.hourly_rate is not None else self.base_fixed_price}
+
 
 class ServicePackage(models.Model):
     service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name="packages")
@@ -211,6 +427,11 @@ class ServicePackage(models.Model):
         return f"{self.service.name} · {self.title}"
 
 
+class ServiceRequestQuerySet(models.QuerySet):
+    def for_vendor(self, vendor):
+        return self.filter(service__vendor=vendor)
+
+
 class ServiceRequest(models.Model):
     PENDING, QUOTED, ACCEPTED, REJECTED, CANCELED = ("PENDING", "QUOTED", "ACCEPTED", "REJECTED", "CANCELED")
     STATUS_CHOICES = [
@@ -228,15 +449,76 @@ class ServiceRequest(models.Model):
     status = models.CharField(_("Status"), max_length=10, choices=STATUS_CHOICES, default=PENDING)
     quoted_price = models.DecimalField(_("Quoted price"), max_digits=10, decimal_places=2, null=True, blank=True)
     estimated_days = models.PositiveIntegerField(_("Estimated days"), null=True, blank=True)
+    is_read = models.BooleanField(_("Read by vendor"), default=False)
+    version = models.PositiveIntegerField(default=1, editable=False)  # bumped on every status change
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ServiceRequestQuerySet.as_manager()
+
+    # statuses each status may move to; see catalog.inbox.transition
+    TRANSITIONS = {
+        PENDING: (QUOTED, REJECTED, CANCELED),
+        QUOTED: (QUOTED, ACCEPTED, REJECTED, CANCELED),
+    }
+
     class Meta:
         verbose_name = _("Service request")
         verbose_name_plural = _("Service requests")
+        indexes = [models.Index(fields=["service", "status", "-created_at", "-id"])]
 
     def __str__(self) -> str:
         return f"Request #{self.id} for {self.service.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # reading a deferred field here would recurse through refresh_from_db
+        if not cls.INBOX_FIELDS & instance.get_deferred_fields():
+            instance._loaded_inbox = instance.inbox_key()
+        return instance
+
+    INBOX_FIELDS = {"service_id", "status", "is_read"}
+
+    def inbox_key(self):
+        """(service_id, status, is_read): what this request contributes to its vendor's inbox counters."""
+        return (self.service_id, self.status, self.is_read)
+
+
+class ServiceInboxCounter(models.Model):
+    """Requests and unread requests per vendor and status, kept in step with ServiceRequest writes."""
+    vendor = models.ForeignKey("profiles.Vendor", on_delete=models.CASCADE, related_name="inbox_counters")
+    status = models.CharField(_("Status"), max_length=10, choices=ServiceRequest.STATUS_CHOICES)
+    total = models.IntegerField(_("Requests"), default=0)
+    unread = models.IntegerField(_("Unread"), default=0)
+
+    class Meta:
+        verbose_name = _("Service inbox counter")
+        verbose_name_plural = _("Service inbox counters")
+        constraints = [models.UniqueConstraint(fields=["vendor", "status"], name="uniq_inbox_counter")]
+
+    def __str__(self) -> str:
+        return f"{self.vendor_id} {self.status}: {self.unread}/{self.total}"
+
+    @classmethod
+    def apply(cls, vendor_id, status, total=0, unread=0) -> None:
+        cls.objects.get_or_create(vendor_id=vendor_id, status=status)
+        cls.objects.filter(vendor_id=vendor_id, status=status).update(
+            total=models.F("total") + total, unread=models.F("unread") + unread,
+        )
+
+    @classmethod
+    def apply_keys(cls, old, new) -> None:
+        """Move one request's contribution from inbox key `old` to `new` (either may be None)."""
+        if old == new:
+            return
+        service_ids = {k[0] for k in (old, new) if k}
+        vendors = dict(Service.objects.filter(pk__in=service_ids).values_list("pk", "vendor_id"))
+        with transaction.atomic():
+            if old:
+                cls.apply(vendors[old[0]], old[1], -1, -(not old[2]))
+            if new:
+                cls.apply(vendors[new[0]], new[1], 1, int(not new[2]))
+
 
 # ---------- Cars ----------
 class Car(models.Model):
@@ -283,12 +565,42 @@ class Car(models.Model):
     class Meta:
         verbose_name = _("Car")
         verbose_name_plural = _("Cars")
+        # facet filters (catalog.facets): make/model drill-down, ranges, and enum combos
+        indexes = [
+            models.Index(fields=["is_active", "make", "model"]),
+            models.Index(fields=["is_active", "price"]),
+            models.Index(fields=["is_active", "year"]),
+            models.Index(fields=["is_active", "mileage_km"]),
+            models.Index(fields=["fuel_type", "transmission", "condition"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.make} {self.model} {self.year}"
 
+    def search_terms(self) -> list:
+        return [self.make, self.model, self.year, self.body_type, self.color, self.description]
+
+    def browse_values(self) -> dict:
+        return {"price": self.price, "year": self.year}
+
 
 # ---------- Real Estate ----------
+class PropertyQuerySet(models.QuerySet):
+    def within(self, south, west, north, east):
+        """Properties inside a map viewport; geohash prefixes prune via index, lat/lng refine."""
+        return self.filter(bbox_q(south, west, north, east))
+
+    def near(self, lat, lng, radius_km):
+        """Properties within `radius_km`, annotated with `distance_km` and ordered nearest first."""
+        lat, lng = float(lat), float(lng)
+        return (
+            self.within(*bbox_around(lat, lng, radius_km))
+            .annotate(distance_km=haversine_expression(lat, lng))
+            .filter(distance_km__lte=radius_km)
+            .order_by(*NEAR_ORDERING)
+        )
+
+
 class Property(models.Model):
     class PropertyType(models.TextChoices):
         APARTMENT = "APARTMENT", _("Apartment")
@@ -312,6 +624,7 @@ class Property(models.Model):
     country = CountryField(_("Country"), blank=True, null=True)
     lat = models.DecimalField(_("Latitude"), max_digits=9, decimal_places=6, null=True, blank=True)
     lng = models.DecimalField(_("Longitude"), max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(_("Geohash"), max_length=12, blank=True, db_index=True, editable=False)
 
     # Specs
     property_type = models.CharField(_("Property type"), max_length=16, choices=PropertyType.choices, default=PropertyType.APARTMENT)
@@ -338,6 +651,8 @@ class Property(models.Model):
     # deprecated legacy flag retained for compatibility
     is_for_rent = models.BooleanField(_("For rent (deprecated)"), default=False)
 
+    objects = PropertyQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Property")
         verbose_name_plural = _("Properties")
@@ -345,6 +660,23 @@ class Property(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        has_point = self.lat is not None and self.lng is not None
+        self.geohash = geohash_encode(float(self.lat), float(self.lng)) if has_point else ""
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "geohash"}
+        super().save(*args, **kwargs)
+
+    def search_terms(self) -> list:
+        return [self.title, self.address, self.city, self.postal_code, self.country and self.country.name]
+
+    def browse_values(self) -> dict:
+        price = self.monthly_rent if self.purpose == self.Purpose.RENT else self.sale_price
+        return {
+            "price": price, "city": self.city, "year": self.year_built,
+            "bedrooms": self.bedrooms, "country": self.country or None,
+        }
+
 
 # ---------- Booking ----------
 class Booking(models.Model):
@@ -366,6 +698,10 @@ class Booking(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # statuses that occupy dates
+    ACTIVE_STATUSES = ("PENDING", "CONFIRMED")
+    OCCUPANCY_FIELDS = {"content_type_id", "object_id", "start_date", "end_date", "quantity", "status"}
+
     class Meta:
         verbose_name = _("Booking")
         verbose_name_plural = _("Bookings")
@@ -373,3 +709,257 @@ class Booking(models.Model):
 
     def __str__(self) -> str:
         return f"{self.bookable} [{self.start_date}→{self.end_date}]"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # reading a deferred field here would recurse through refresh_from_db
+        if not cls.OCCUPANCY_FIELDS & instance.get_deferred_fields():
+            instance._loaded_occupancy = instance.occupancy()
+        return instance
+
+    def occupancy(self):
+        """(content_type_id, object_id, start, end, quantity) while active, else None."""
+        if self.status not in self.ACTIVE_STATUSES or None in (self.start_date, self.end_date):
+            return None
+        return (self.content_type_id, self.object_id, self.start_date, self.end_date, self.quantity)
+
+
+def empty_calendar_year() -> bytes:
+    return bytes(AvailabilityCalendar.DAYS)
+
+
+class AvailabilityCalendar(models.Model):
+    """
+    Booked units per day for one bookable and one year: byte i of `days` counts day i
+    (0 = Jan 1). Maintained from Booking saves/deletes; see catalog.occupancy.
+    """
+    DAYS = 366
+    MAX_COUNT = 255
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    year = models.PositiveSmallIntegerField(_("Year"))
+    days = models.BinaryField(_("Booked units per day"), default=empty_calendar_year)
+
+    class Meta:
+        verbose_name = _("Availability calendar")
+        verbose_name_plural = _("Availability calendars")
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "object_id", "year"], name="uniq_calendar_year"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_type_id}:{self.object_id} {self.year}"
+
+    @staticmethod
+    def day_index(d: date) -> int:
+        return d.timetuple().tm_yday - 1
+
+    @classmethod
+    def apply(cls, content_type_id, object_id, start: date, end: date, delta: int) -> None:
+        """Add `delta` units to every day of [start, end), touching one row per calendar year."""
+        with transaction.atomic():
+            for year in range(start.year, (end - timedelta(days=1)).year + 1):
+                cls.objects.get_or_create(content_type_id=content_type_id, object_id=object_id, year=year)
+                cal = cls.objects.select_for_update().get(content_type_id=content_type_id, object_id=object_id, year=year)
+                days = bytearray(cal.days)
+                first = cls.day_index(max(start, date(year, 1, 1)))
+                last = cls.day_index(min(end - timedelta(days=1), date(year, 12, 31)))
+                for i in range(first, last + 1):
+                    days[i] = min(max(days[i] + delta, 0), cls.MAX_COUNT)
+                cal.days = bytes(days)
+                cal.save(update_fields=["days"])
+
+
+# ---------- Availability calendar maintenance ----------
+@receiver(pre_save, sender=Booking)
+def booking_occupancy_snapshot(sender, instance, raw=False, **kwargs):
+    # loaded with deferred occupancy fields: read the stored row before it is overwritten
+    if not raw and not instance._state.adding and not hasattr(instance, "_loaded_occupancy"):
+        stored = Booking.objects.filter(pk=instance.pk).only(*Booking.OCCUPANCY_FIELDS).first()
+        instance._loaded_occupancy = stored.occupancy() if stored else None
+
+
+@receiver(post_save, sender=Booking)
+def booking_calendar(sender, instance, raw=False, **kwargs):
+    old, new = getattr(instance, "_loaded_occupancy", None), instance.occupancy()
+    if raw or old == new:
+        return
+    if old:
+        AvailabilityCalendar.apply(*old[:4], -old[4])
+    if new:
+        AvailabilityCalendar.apply(*new[:4], new[4])
+    instance._loaded_occupancy = new
+
+
+@receiver(post_delete, sender=Booking)
+def booking_calendar_delete(sender, instance, **kwargs):
+    old = getattr(instance, "_loaded_occupancy", None) or instance.occupancy()
+    if old:
+        AvailabilityCalendar.apply(*old[:4], -old[4])
+
+
+# ---------- Service inbox counters ----------
+@receiver(pre_save, sender=ServiceRequest)
+def service_request_inbox_snapshot(sender, instance, raw=False, **kwargs):
+    # loaded with deferred counter fields: read the stored row before it is overwritten
+    if not raw and not instance._state.adding and not hasattr(instance, "_loaded_inbox"):
+        stored = ServiceRequest.objects.filter(pk=instance.pk).only(*ServiceRequest.INBOX_FIELDS).first()
+        instance._loaded_inbox = stored.inbox_key() if stored else None
+
+
+@receiver(post_save, sender=ServiceRequest)
+def service_request_counters(sender, instance, raw=False, **kwargs):
+    old, new = getattr(instance, "_loaded_inbox", None), instance.inbox_key()
+    if not raw:
+        ServiceInboxCounter.apply_keys(old, new)
+        instance._loaded_inbox = new
+
+
+@receiver(post_delete, sender=ServiceRequest)
+def service_request_counters_delete(sender, instance, **kwargs):
+    ServiceInboxCounter.apply_keys(getattr(instance, "_loaded_inbox", None) or instance.inbox_key(), None)
+
+
+# ---------- Homepage snapshots ----------
+# snapshots only list active (published) listings: drafts and pending edits leave them alone
+@receiver(post_save, sender=Listing)
+def listing_snapshots_stale(sender, instance, created, raw=False, **kwargs):
+    was_active = False if created else getattr(instance, "_loaded_active", True)
+    if not raw and (instance.is_active or was_active):
+        bump_listings_version()
+    instance._loaded_active = instance.is_active
+
+
+@receiver(post_delete, sender=Listing)
+def listing_snapshots_stale_delete(sender, instance, **kwargs):
+    if getattr(instance, "_loaded_active", True):
+        bump_listings_version()
+
+
+# ---------- Category tree cache ----------
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_tree_changed(sender, **kwargs):
+    # raw saves too: loaddata changes the tree just the same
+    bump_tree_version()
+
+
+# ---------- Listing index maintenance ----------
+INDEX_FIELDS = ["search_document", "category_path", "price", "city", "year", "bedrooms", "country"]
+INDEX_SOURCE_FIELDS = {"title", "teaser", "category", "vendor", "country", "content_type", "object_id"}
+
+
+def refresh_listing_index(listings) -> None:
+    listings = list(listings)
+    for listing in listings:
+        for field, value in listing.index_values().items():
+            setattr(listing, field, value)
+    Listing.objects.bulk_update(listings, INDEX_FIELDS)
+
+
+def _listings_for(obj):
+    ct = ContentType.objects.get_for_model(obj)
+    return Listing.objects.select_related("vendor", "category").filter(content_type=ct, object_id=obj.pk).with_content_objects()
+
+
+@receiver(post_save, sender=Listing)
+def listing_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not INDEX_SOURCE_FIELDS & set(update_fields)):
+        return
+    changed = {f: v for f, v in instance.index_values().items() if getattr(instance, f) != v}
+    if changed:
+        for field, value in changed.items():
+            setattr(instance, field, value)
+        Listing.objects.filter(pk=instance.pk).update(**changed)
+
+
+def touch_listings(listings) -> None:
+    """Bump updated_at so cached detail pages and client ETags for these listings go stale."""
+    Listing.objects.filter(pk__in=[l.pk for l in listings]).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Car)
+@receiver(post_save, sender=Property)
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=ProductGroup)
+def content_listing_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        listings = list(_listings_for(instance))
+        refresh_listing_index(listings)
+        touch_listings(listings)
+
+
+@receiver(m2m_changed, sender=ProductGroup.products.through)
+def product_group_products_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, ProductGroup):
+        listings = list(_listings_for(instance))
+        refresh_listing_index(listings)
+        touch_listings(listings)
+
+
+def refresh_group_listings(group_ids) -> None:
+    """Re-index the listings of the given ProductGroups (ids or a values() subquery)."""
+    ct = ContentType.objects.get_for_model(ProductGroup)
+    listings = list(
+        Listing.objects.select_related("vendor", "category")
+        .filter(content_type=ct, object_id__in=group_ids).with_content_objects()
+    )
+    if listings:
+        refresh_listing_index(listings)
+        touch_listings(listings)
+
+
+def refresh_product_listings(product_ids) -> None:
+    """Re-index listings whose group contains one of `product_ids`; a group's price is its cheapest product."""
+    through = ProductGroup.products.through
+    refresh_group_listings(through.objects.filter(product_id__in=list(product_ids)).values("productgroup_id"))
+
+
+@receiver(post_save, sender=Product)
+def product_listing_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and "base_price" not in update_fields):
+        return
+    refresh_product_listings([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def product_groups_before_delete(sender, instance, **kwargs):
+    # the M2M rows are gone by post_delete
+    instance._group_ids = list(instance.groups.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Product)
+def product_delete_listing_index(sender, instance, **kwargs):
+    if getattr(instance, "_group_ids", None):
+        refresh_group_listings(instance._group_ids)
+
+
+@receiver(post_save, sender=Category)
+def category_listing_index(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # only the name and path are copied onto listings
+    if raw or created or (update_fields is not None and not {"name", "slug", "parent"} & set(update_fields)):
+        return
+    indexed = (instance.name, instance.path)
+    if getattr(instance, "_loaded_indexed", None) == indexed:
+        return
+    listings = list(instance.listings.select_related("vendor", "category").with_content_objects())
+    refresh_listing_index(listings)
+    touch_listings(listings)
+    if any(l.is_active for l in listings):
+        bump_listings_version()  # snapshots show the category name
+    instance._loaded_indexed = indexed
+
+
+@receiver(post_save, sender="profiles.Vendor")
+def vendor_listing_index(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # only the display name is copied onto listings
+    if raw or created or (update_fields is not None and "display_name" not in update_fields):
+        return
+    if getattr(instance, "_loaded_display_name", None) == instance.display_name:
+        return
+    listings = list(instance.listings.select_related("vendor", "category").with_content_objects())
+    refresh_listing_index(listings)
+    touch_listings(listings)
+    instance._loaded_display_name = instance.display_name
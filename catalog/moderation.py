@@ -0,0 +1,83 @@
+# catalog/moderation.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Listing, ListingModeration
+from .snapshots import bump_listings_version
+
+BATCH_SIZE = 1000
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def sources_for(to_status) -> list:
+    """Statuses from which Listing.TRANSITIONS allows a move to `to_status`."""
+    return [src for src, targets in Listing.TRANSITIONS.items() if to_status in targets]
+
+
+def _changes(to_status, notes, now) -> dict:
+    changes = {"status": to_status, "is_active": to_status == Listing.Status.PUBLISHED, "updated_at": now}
+    if to_status == Listing.Status.PUBLISHED:
+        changes["published_at"] = now
+    elif to_status == Listing.Status.PENDING:
+        changes["submitted_at"] = now
+    if to_status in (Listing.Status.PUBLISHED, Listing.Status.REJECTED):
+        changes["review_notes"] = notes
+    return changes
+
+
+def moderate(listing_ids, to_status, actor=None, notes="", batch_size=BATCH_SIZE) -> int:
+    """
+    Move every listing in `listing_ids` that may legally go to `to_status` there; listings in
+    other statuses are left alone. Each batch is one locking SELECT, one UPDATE and one bulk
+    INSERT into the audit trail. Returns how many listings changed.
+    """
+    sources = sources_for(to_status)
+    if not sources:
+        raise InvalidTransition(f"No status can move to {to_status}.")
+    ids = list(listing_ids)
+    now = timezone.now()
+    changes = _changes(to_status, notes, now)
+    moved, published_changed = 0, to_status == Listing.Status.PUBLISHED
+    for i in range(0, len(ids), batch_size):
+        with transaction.atomic():
+            by_status = defaultdict(list)
+            rows = (
+                Listing.objects.select_for_update()
+                .filter(pk__in=ids[i:i + batch_size], status__in=sources)
+                .values_list("pk", "status")
+            )
+            for pk, status in rows:
+                by_status[status].append(pk)
+            batch = [pk for pks in by_status.values() for pk in pks]
+            if not batch:
+                continue
+            Listing.objects.filter(pk__in=batch, status__in=sources).update(**changes)
+            ListingModeration.objects.bulk_create([
+                ListingModeration(
+                    listing_id=pk, from_status=status, to_status=to_status,
+                    actor=actor, notes=notes,
+                )
+                for status, pks in by_status.items() for pk in pks
+            ])
+            moved += len(batch)
+            published_changed |= Listing.Status.PUBLISHED in by_status
+    # homepage snapshots only list published listings
+    if moved and published_changed:
+        bump_listings_version()
+    return moved
+
+
+def transition(listing, to_status, actor=None, notes="") -> Listing:
+    """Single-listing move (e.g. a seller submitting); raises InvalidTransition if not allowed."""
+    if to_status not in Listing.TRANSITIONS.get(listing.status, ()):
+        raise InvalidTransition(f"Cannot move a {listing.status} listing to {to_status}.")
+    if not moderate([listing.pk], to_status, actor, notes):
+        raise InvalidTransition(f"Listing {listing.pk} changed status in the meantime.")
+    for field, value in Listing.objects.filter(pk=listing.pk).values(*_changes(to_status, notes, None)).get().items():
+        setattr(listing, field, value)
+    return listing
@@ -0,0 +1,56 @@
+# catalog/occupancy.py
+from datetime import date, timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .models import AvailabilityCalendar, Booking
+
+
+def booked_units(obj, start: date, end: date) -> list:
+    """Booked units for each day of [start, end), read from the calendar rows only (no Booking scan)."""
+    ct = ContentType.objects.get_for_model(obj)
+    last = end - timedelta(days=1)
+    years = dict(
+        AvailabilityCalendar.objects.filter(
+            content_type=ct, object_id=obj.pk, year__gte=start.year, year__lte=last.year
+        ).values_list("year", "days")
+    )
+    out, d = [], start
+    while d < end:
+        days = years.get(d.year)
+        out.append(days[AvailabilityCalendar.day_index(d)] if days is not None else 0)
+        d += timedelta(days=1)
+    return out
+
+
+def booked_objects(content_type, object_ids, start: date, end: date) -> set:
+    """Which of `object_ids` have a booked day in [start, end) — one calendar query for any number of ids."""
+    last = end - timedelta(days=1)
+    rows = AvailabilityCalendar.objects.filter(
+        content_type=content_type, object_id__in=object_ids, year__gte=start.year, year__lte=last.year
+    ).values_list("object_id", "year", "days")
+    booked = set()
+    for object_id, year, days in rows:
+        first = AvailabilityCalendar.day_index(max(start, date(year, 1, 1)))
+        final = AvailabilityCalendar.day_index(min(last, date(year, 12, 31)))
+        if any(days[first:final + 1]):
+            booked.add(object_id)
+    return booked
+
+
+def calendar_days(obj, start: date, days=365) -> list:
+    """[(date, booked units, free?)] for rendering an availability calendar."""
+    units = booked_units(obj, start, start + timedelta(days=days))
+    return [(start + timedelta(days=i), n, n == 0) for i, n in enumerate(units)]
+
+
+def rebuild(content_type, object_id) -> None:
+    """Recompute one bookable's calendars from its Booking rows (repair after raw/bulk updates)."""
+    with transaction.atomic():
+        AvailabilityCalendar.objects.filter(content_type=content_type, object_id=object_id).delete()
+        bookings = Booking.objects.filter(
+            content_type=content_type, object_id=object_id, status__in=Booking.ACTIVE_STATUSES
+        ).values_list("start_date", "end_date", "quantity")
+        for start, end, quantity in bookings:
+            AvailabilityCalendar.apply(content_type.pk, object_id, start, end, quantity)
@@ -0,0 +1,136 @@
+# catalog/pagination.py
+import base64
+import json
+import math
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+PAGE_SIZE = 24
+DEFAULT_ORDERING = ("-created_at", "-id")
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_token=None, previous_token=None):
+        self.object_list = object_list
+        self.next_token = next_token
+        self.previous_token = previous_token
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_token is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_token is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+def encode_cursor(direction: str, values) -> str:
+    # str() keeps full microsecond precision for datetimes (DjangoJSONEncoder truncates to ms)
+    raw = json.dumps({"d": direction, "v": values}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        direction, values = data["d"], data["v"]
+    except (ValueError, TypeError, KeyError):
+        return None, None
+    if direction not in ("n", "p") or not isinstance(values, list):
+        return None, None
+    return direction, values
+
+
+def _ordering_field(qs, name):
+    if name in qs.query.annotations:
+        return qs.query.annotations[name].output_field
+    return qs.model._meta.pk if name == "pk" else qs.model._meta.get_field(name)
+
+
+def clean_cursor_values(qs, fields, values):
+    """
+    Cursor values converted to the types of the ordering `fields`, or None when the cursor
+    does not fit them (wrong length, nulls, values the field rejects). Tokens come from the
+    query string, so anything unexpected means "start from the first page", never a 500.
+    """
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    cleaned = []
+    for name, value in zip(fields, values):
+        if value is None:
+            return None
+        field = _ordering_field(qs, name)
+        try:
+            value = field.to_python(value)
+            field.run_validators(value)
+        except (ValidationError, TypeError, ValueError, OverflowError):
+            return None
+        if value is None or (isinstance(value, (float, Decimal)) and not math.isfinite(value)):
+            return None
+        cleaned.append(value)
+    return cleaned
+
+
+def _after(ordering, values, reverse=False) -> Q:
+    """Row-value comparison `(k1, k2, ...) > (v1, v2, ...)` in ordering direction, expanded for the ORM."""
+    q = Q()
+    equal = Q()
+    for key, value in zip(ordering, values):
+        desc = key.startswith("-")
+        field = key.lstrip("-")
+        op = "lt" if desc != reverse else "gt"
+        q |= equal & Q(**{f"{field}__{op}": value})
+        equal &= Q(**{field: value})
+    return q
+
+
+def keyset_paginate(qs, cursor=None, ordering=DEFAULT_ORDERING, per_page=PAGE_SIZE) -> KeysetPage:
+    """
+    Cursor pagination over `ordering`, whose last key must be unique (normally `id`).
+    Tokens are opaque and stay valid when rows are inserted ahead of them.
+    """
+    ordering = tuple(ordering)
+    fields = [k.lstrip("-") for k in ordering]
+    direction, values = decode_cursor(cursor) if cursor else (None, None)
+    if values is not None:
+        values = clean_cursor_values(qs, fields, values)
+        if values is None:
+            direction = None
+
+    if direction == "p":
+        reversed_ordering = [k[1:] if k.startswith("-") else f"-{k}" for k in ordering]
+        rows = list(qs.filter(_after(ordering, values, reverse=True)).order_by(*reversed_ordering)[: per_page + 1])
+        more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+    else:
+        if direction == "n":
+            qs = qs.filter(_after(ordering, values))
+        rows = list(qs.order_by(*ordering)[: per_page + 1])
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+
+    def key_of(obj):
+        return [getattr(obj, f) for f in fields]
+
+    next_token = previous_token = None
+    if rows:
+        if direction == "p":
+            previous_token = encode_cursor("p", key_of(rows[0])) if more else None
+            next_token = encode_cursor("n", key_of(rows[-1]))
+        else:
+            next_token = encode_cursor("n", key_of(rows[-1])) if more else None
+            previous_token = encode_cursor("p", key_of(rows[0])) if direction == "n" else None
+    return KeysetPage(rows, next_token, previous_token)
@@ -0,0 +1,122 @@
+# catalog/pricing.py
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import NamedTuple
+
+from django.contrib.contenttypes.models import ContentType
+
+from .models import Property, Service, ServicePackage
+
+CENT = Decimal("0.01")
+DAYS_PER_MONTH = Decimal(30)  # monthly_rent is prorated per night on a 30-day month
+ZERO = Decimal(0)
+
+
+class PriceMismatch(ValueError):
+    def __init__(self, expected, given):
+        super().__init__(f"Total price {given} does not match the computed price {expected}.")
+        self.expected = expected
+        self.given = given
+
+
+class ServiceLine(NamedTuple):
+    service_id: int
+    package_id: int = None
+    hours: int = None
+
+
+def money(value):
+    return None if value is None else value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _service_price(service, package=None, hours=None):
+    """Unrounded price of one engagement; None when the service has no usable rate."""
+    if package is not None:
+        return package.price
+    billable = max(hours or 0, service.min_hours)
+    hourly = None if service.hourly_rate is None else service.hourly_rate * billable
+    if service.pricing_type == Service.PricingType.HOURLY:
+        return hourly
+    if service.pricing_type == Service.PricingType.FIXED:
+        return service.base_fixed_price
+    if hourly is None and service.base_fixed_price is None:
+        return None
+    return (service.base_fixed_price or ZERO) + (hourly or ZERO)
+
+
+def _nightly_rent(prop):
+    if prop.purpose != Property.Purpose.RENT or prop.monthly_rent is None:
+        return None
+    return prop.monthly_rent / DAYS_PER_MONTH
+
+
+def _load(model, ids, fields):
+    return model.objects.only(*fields).in_bulk(ids) if ids else {}
+
+
+def price_service_lines(lines) -> list:
+    """
+    Prices for ServiceLine(service_id, package_id, hours) rows, in input order. Services and
+    packages are each loaded with one query however many lines are priced; a package only
+    counts if it is active and belongs to the line's service.
+    """
+    lines = [ServiceLine(*line) for line in lines]
+    services = _load(Service, {l.service_id for l in lines}, ["pricing_type", "hourly_rate", "min_hours", "base_fixed_price"])
+    package_ids = {l.package_id for l in lines if l.package_id is not None}
+    packages = {
+        p.pk: p for p in ServicePackage.objects.filter(pk__in=package_ids, is_active=True).only("service_id", "price")
+    } if package_ids else {}
+    out = []
+    for line in lines:
+        service = services.get(line.service_id)
+        package = packages.get(line.package_id)
+        if package is not None and package.service_id != line.service_id:
+            package = None
+        if service is None or (line.package_id is not None and package is None):
+            out.append(None)
+            continue
+        out.append(money(_service_price(service, package, line.hours)))
+    return out
+
+
+def price_service_requests(requests) -> list:
+    """Standard quote (minimum billable hours) for each ServiceRequest, for pre-filling quoted_price."""
+    return price_service_lines(ServiceLine(r.service_id) for r in requests)
+
+
+def price_bookings(bookings) -> list:
+    """
+    Total price for each (possibly unsaved) Booking, in input order; None when its bookable
+    has no price. One query per bookable model, not per booking.
+
+    Rentals bill prorated monthly_rent per night; services bill one minimum engagement per
+    booked day. Both are multiplied by quantity and rounded to cents once, at the end.
+    """
+    bookings = list(bookings)
+    property_ct = ContentType.objects.get_for_model(Property)
+    service_ct = ContentType.objects.get_for_model(Service)
+    ids = defaultdict(set)
+    for b in bookings:
+        ids[b.content_type_id].add(b.object_id)
+    properties = _load(Property, ids[property_ct.pk], ["purpose", "monthly_rent"])
+    services = _load(Service, ids[service_ct.pk], ["pricing_type", "hourly_rate", "min_hours", "base_fixed_price"])
+
+    out = []
+    for b in bookings:
+        days = (b.end_date - b.start_date).days
+        unit = None
+        if b.content_type_id == property_ct.pk and b.object_id in properties:
+            unit = _nightly_rent(properties[b.object_id])
+        elif b.content_type_id == service_ct.pk and b.object_id in services:
+            unit = _service_price(services[b.object_id])
+        out.append(None if unit is None or days <= 0 else money(unit * days * b.quantity))
+    return out
+
+
+def check_total(expected, given):
+    """The total to store: `expected` when nothing was given, else `given` if it matches."""
+    if given is None:
+        return expected
+    if expected is not None and money(Decimal(given)) != expected:
+        raise PriceMismatch(expected, given)
+    return given
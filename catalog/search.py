@@ -0,0 +1,81 @@
+# catalog/search.py
+import re
+from collections import defaultdict
+
+from django.db import connections
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.functions import Cast
+
+# Language-neutral config: listings are written in EN/DE/AR.
+SEARCH_CONFIG = "simple"
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SEARCH_ORDERING = ("-rank", "-created_at", "-id")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def search_listings(qs, q: str):
+    """Filter `qs` to listings matching `q`, annotated with `rank` and ordered by relevance."""
+    if connections[qs.db].vendor == "postgresql":
+        return _search_postgres(qs, q)
+    return _search_inverted_index(qs, q)
+
+
+def _search_postgres(qs, q):
+    # Expression must match the GIN index created in migration 0007.
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    vector = SearchVector("search_document", config=SEARCH_CONFIG)
+    query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+    # float8 cast keeps the rank exact through a JSON round trip in pagination cursors
+    rank = Cast(SearchRank(vector, query), FloatField())
+    return qs.annotate(search=vector, rank=rank).filter(search=query).order_by(*SEARCH_ORDERING)
+
+
+class InvertedIndex:
+    """In-memory token -> {listing id: term frequency} map used when Postgres is unavailable."""
+
+    def __init__(self, rows):
+        self.postings = defaultdict(dict)
+        for pk, doc in rows:
+            for token in tokenize(doc):
+                self.postings[token][pk] = self.postings[token].get(pk, 0) + 1
+
+    def lookup(self, term: str) -> dict:
+        # prefix match so partial words behave like search-as-you-type
+        hits = defaultdict(int)
+        for token, postings in self.postings.items():
+            if token.startswith(term):
+                for pk, tf in postings.items():
+                    hits[pk] += tf
+        return hits
+
+    def search(self, q: str) -> dict:
+        terms = tokenize(q)
+        if not terms:
+            return {}
+        scores = None
+        for term in terms:
+            hits = self.lookup(term)
+            if scores is None:
+                scores = dict(hits)
+            else:
+                scores = {pk: s + hits[pk] for pk, s in scores.items() if pk in hits}
+            if not scores:
+                return {}
+        return scores
+
+
+def _search_inverted_index(qs, q):
+    index = InvertedIndex(qs.values_list("pk", "search_document"))
+    scores = index.search(q)
+    if not scores:
+        return qs.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    rank = Case(
+        *[When(pk=pk, then=Value(float(score))) for pk, score in scores.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    return qs.filter(pk__in=list(scores)).annotate(rank=rank).order_by(*SEARCH_ORDERING)
@@ -0,0 +1,71 @@
+# catalog/slugs.py
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SUFFIX_ROOM = 8  # "-" + up to 7 digits always fits after truncation
+SAVE_ATTEMPTS = 3
+
+
+def _stem(base, max_length, fallback) -> str:
+    return (slugify(base or "")[:max_length].strip("-") or fallback)[:max_length]
+
+
+def _with_suffix(stem, n, max_length) -> str:
+    if n == 1:
+        return stem
+    suffix = f"-{n}"
+    return stem[: max_length - len(suffix)].rstrip("-") + suffix
+
+
+def _candidates(field, stem, root_length) -> Q:
+    if len(stem) <= root_length:
+        return Q(**{f"{field}__startswith": stem, f"{field}__regex": rf"^{re.escape(stem)}(-[0-9]+)?$"})
+    return Q(**{f"{field}__startswith": stem[:root_length]})
+
+
+def allocate_slugs(model, bases, field="slug", fallback="item") -> list:
+    """
+    One unique slug per entry of `bases`, in order, for `model.<field>`.
+
+    One query per batch finds every slug that could collide. A stem short enough to never be
+    cut only collides with "<stem>" or "<stem>-N", so it is matched exactly by regex (the
+    `startswith` keeps the index usable) rather than loading every slug sharing the prefix.
+    Longer stems match on their first max_length - SUFFIX_ROOM characters. Truncation always
+    cuts the stem, never the "-N" suffix, and the batch never hands out the same slug twice.
+    """
+    max_length = model._meta.get_field(field).max_length
+    stems = [_stem(b, max_length, fallback) for b in bases]
+    root_length = max_length - SUFFIX_ROOM
+    taken = set()
+    if stems:
+        query = reduce(or_, (_candidates(field, s, root_length) for s in set(stems)))
+        taken = set(model._default_manager.filter(query).values_list(field, flat=True))
+    slugs = []
+    for stem in stems:
+        n = 1
+        while _with_suffix(stem, n, max_length) in taken:
+            n += 1
+        slug = _with_suffix(stem, n, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(obj, base, field="slug", fallback="item", attempts=SAVE_ATTEMPTS, **save_kwargs):
+    """Give `obj` a fresh slug from `base` and save it, re-allocating if a concurrent insert took it."""
+    model = type(obj)
+    for attempt in range(attempts):
+        setattr(obj, field, allocate_slugs(model, [base], field, fallback)[0])
+        try:
+            with transaction.atomic():
+                obj.save(**save_kwargs)
+            return obj
+        except IntegrityError:
+            lost_race = model._default_manager.filter(**{field: getattr(obj, field)}).exists()
+            if not lost_race or attempt == attempts - 1:
+                raise
@@ -0,0 +1,82 @@
+# catalog/snapshots.py
+import time
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+
+VERSION_KEY = "catalog:listings:version"
+LATEST_KEY = "catalog:latest-listings:{lang}:{country}:{limit}"
+LOCK_KEY = "{key}:rebuild"
+FRESH_FOR = 60  # seconds before a snapshot is rebuilt even without a publish event
+KEEP_FOR = 60 * 60  # stale snapshots stay servable this long while one worker rebuilds
+LOCK_TTL = 30
+WAIT_STEP, WAIT_STEPS = 0.05, 40  # a cold-cache loser polls up to 2s before building itself
+
+
+def listings_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_listings_version() -> None:
+    """Mark every snapshot stale (called when listings are published, changed or removed)."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _rebuild(key, version, build):
+    value = build()
+    cache.set(key, (version, time.time() + FRESH_FOR, value), KEEP_FOR)
+    cache.delete(LOCK_KEY.format(key=key))
+    return value
+
+
+def snapshot(key, build):
+    """
+    `build()` result cached under `key`, rebuilt by exactly one caller when it goes stale
+    (TTL or version bump). Everyone else keeps serving the previous value meanwhile, so an
+    expiry under load costs one rebuild instead of one per request.
+    """
+    version = listings_version()
+    entry = cache.get(key)
+    if entry is not None:
+        entry_version, fresh_until, value = entry
+        if entry_version == version and fresh_until > time.time():
+            return value
+        if cache.add(LOCK_KEY.format(key=key), 1, LOCK_TTL):
+            return _rebuild(key, version, build)
+        return value
+    # nothing to serve yet: one caller builds, the rest wait briefly for its result
+    if cache.add(LOCK_KEY.format(key=key), 1, LOCK_TTL):
+        return _rebuild(key, version, build)
+    for _ in range(WAIT_STEPS):
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[2]
+    return build()
+
+
+def latest_listings(lang, country=None, limit=8) -> list:
+    """Newest active listings as plain dicts (slug, title, type, category_name, hero_url) for the homepage."""
+    from .models import Listing
+
+    def build():
+        qs = Listing.objects.filter(is_active=True)
+        if country:
+            qs = qs.filter(country=country)
+        rows = qs.order_by("-created_at", "-id").values("slug", "title", "type", "category__name", "hero_image")[:limit]
+        return [
+            {
+                "slug": r["slug"], "title": r["title"], "type": r["type"], "category_name": r["category__name"],
+                "hero_url": default_storage.url(r["hero_image"]) if r["hero_image"] else "",
+            }
+            for r in rows
+        ]
+
+    return snapshot(LATEST_KEY.format(lang=lang, country=country or "-", limit=limit), build)
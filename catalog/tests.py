@@ -1,3 +1,869 @@
-from django.test import TestCase
+import io
+import importlib
+import threading
+import unittest
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import OperationalError, close_old_connections, connection
+from django.template import RequestContext, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.models import Vendor
+from django.utils import timezone
+
+from .categories import bump_tree_version, get_category_tree
+from .availability import BookingUnavailable, create_booking, free_among
+from .geo import geohash_encode, haversine_km
+from .importers import ImportFileError, ProductImporter, iter_rows, openpyxl
+from .inbox import InvalidTransition, StaleRequest, inbox_counts, inbox_page, mark_read, transition
+from .inventory import InsufficientStock, commit, expire_stale, release, reserve
+from .models import (
+    Booking, Car, Category, Inventory, Listing, ListingModeration, Product, ProductGroup, ProductVariant,
+    Property, Service, ServicePackage, ServiceRequest, StockReservation,
+)
+from .moderation import InvalidTransition as IllegalListingMove, moderate, transition as move_listing
+from .occupancy import booked_units
+from .pagination import encode_cursor, keyset_paginate
+from .pricing import PriceMismatch, price_service_lines
+from .search import search_listings
+from .slugs import allocate_slugs
+from .snapshots import LATEST_KEY, bump_listings_version, latest_listings, listings_version
+
+
+class SellerFixtureMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("seller", password="pw")
+        cls.vendor = Vendor.objects.create(owner=cls.user, display_name="Shop", slug="shop", is_active=True)
+
+
+LISTING_TYPES = {Car: "CAR", Property: "PROPERTY", Service: "SERVICE", ProductGroup: "PRODUCT"}
+
+
+def make_listing(obj, category, slug, **fields):
+    fields.setdefault("title", slug)
+    return Listing.objects.create(
+        slug=slug, type=LISTING_TYPES[type(obj)], vendor=obj.vendor, category=category, content_object=obj, **fields
+    )
+
+
+class SearchTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        cars = Category.objects.create(name="Cars", slug="cars")
+        specs = [("often", "Golf", "golf golf estate"), ("once", "Golf", ""), ("other", "Polo", "city car")]
+        self.listings = {
+            slug: make_listing(
+                Car.objects.create(vendor=self.vendor, make="VW", model=model, year=2020, price=1, description=text),
+                cars, slug,
+            )
+            for slug, model, text in specs
+        }
+
+    def slugs(self, q):
+        return [l.slug for l in search_listings(Listing.objects.all(), q)]
+
+    def test_fallback_ranks_by_term_frequency_and_matches_prefixes(self):
+        self.assertEqual(self.slugs("golf"), ["often", "once"])
+        self.assertEqual(self.slugs("GOL"), ["often", "once"])
+        self.assertEqual(self.slugs("golf estate"), ["often"])  # every term must match
+        self.assertEqual(self.slugs("golf polo"), [])
+        self.assertEqual(self.slugs("!!"), [])
+
+    def test_listing_list_orders_by_rank(self):
+        resp = self.client.get(reverse("catalog:listing_list"), {"q": "golf"})
+        self.assertEqual([l.slug for l in resp.context["listings"]], ["often", "once"])
+
+    def test_migration_backfills_existing_listings(self):
+        expected = dict(Listing.objects.values_list("pk", "search_document"))
+        Listing.objects.update(search_document="")
+        migration = importlib.import_module("catalog.migrations.0007_listing_search_document")
+        migration.fill_search_documents(apps, None, batch_size=2)
+        self.assertEqual(dict(Listing.objects.values_list("pk", "search_document")), expected)
+        self.assertEqual(self.slugs("golf"), ["often", "once"])
+
+
+class KeysetPaginationTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Cars", slug="cars")
+        self.listings = [self.add(f"car-{i}") for i in range(5)]
+
+    def add(self, slug):
+        car = Car.objects.create(vendor=self.vendor, make="VW", model="Golf", year=2020, price=1)
+        return make_listing(car, self.category, slug)
+
+    def page(self, cursor=None):
+        return keyset_paginate(Listing.objects.all(), cursor, per_page=2)
+
+    def test_tokens_walk_both_ways_and_survive_inserts(self):
+        first = self.page()
+        self.assertEqual([l.slug for l in first], ["car-4", "car-3"])
+        self.assertFalse(first.has_previous)
+        second = self.page(first.next_token)
+        self.add("car-new")  # lands ahead of the cursor: nothing shifts
+        self.assertEqual([l.slug for l in self.page(first.next_token)], ["car-2", "car-1"])
+        last = self.page(second.next_token)
+        self.assertEqual(([l.slug for l in last], last.has_next), (["car-0"], False))
+        self.assertEqual([l.slug for l in self.page(last.previous_token)], ["car-2", "car-1"])
+
+    def test_malformed_cursors_fall_back_to_first_page(self):
+        url = reverse("catalog:listing_list")
+        first = [l.slug for l in self.client.get(url).context["listings"]]
+        tokens = [
+            "%%%", encode_cursor("x", ["2030-01-01", 1]), encode_cursor("n", ["garbage", 1]),
+            encode_cursor("n", [{"a": 1}, 1]), encode_cursor("n", ['{"a":1}', 1]), encode_cursor("p", [None, None]),
+            encode_cursor("n", [str(timezone.now()), 2 ** 70]), encode_cursor("n", [str(timezone.now())]),
+        ]
+        for token in tokens:
+            resp = self.client.get(url, {"cursor": token})
+            self.assertEqual([l.slug for l in resp.context["listings"]], first, token)
+        search = {"q": "golf", "cursor": encode_cursor("n", ["high", str(timezone.now()), 1])}
+        self.assertEqual(self.client.get(url, search).status_code, 200)
+        price = {"sort": "price", "cursor": encode_cursor("n", ["NaN", 1])}
+        self.assertEqual(self.client.get(url, price).status_code, 200)
+
+
+class ContentObjectPrefetchTests(SellerFixtureMixin, TestCase):
+    def add_one_of_each(self, n):
+        category = Category.objects.get_or_create(name="All", slug="all")[0]
+        objects = [
+            Car.objects.create(vendor=self.vendor, make="VW", model="Golf", year=2020, price=1),
+            Property.objects.create(vendor=self.vendor, title="Flat", address="Str. 1", city="Berlin"),
+            Service.objects.create(vendor=self.vendor, name="Design"),
+            ProductGroup.objects.create(vendor=self.vendor, title="Group"),
+        ]
+        ServicePackage.objects.create(service=objects[2], title="Basic", price=10)
+        objects[3].products.add(Product.objects.create(vendor=self.vendor, name="Item", sku=f"SKU-{n}"))
+        for obj in objects:
+            make_listing(obj, category, f"{type(obj).__name__.lower()}-{n}")
+
+    def resolve_all(self):
+        for listing in Listing.objects.with_content_objects():
+            obj = listing.content_object
+            if isinstance(obj, Service):
+                list(obj.packages.all())
+            elif isinstance(obj, ProductGroup):
+                list(obj.products.all())
+
+    def test_query_count_does_not_grow_with_listings(self):
+        self.add_one_of_each(0)
+        self.resolve_all()  # content type cache
+        # listings, one IN query per concrete type, packages, products
+        with self.assertNumQueries(7):
+            self.resolve_all()
+        for n in range(1, 6):
+            self.add_one_of_each(n)
+        with self.assertNumQueries(7):
+            self.resolve_all()
+
+
+class CategoryTreeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.cars = Category.objects.create(name="Cars", slug="cars")
+        Category.objects.create(name="SUV", slug="suv", parent=self.cars)
+
+    def test_tree_is_cached_until_a_category_changes(self):
+        tree = get_category_tree()
+        self.assertEqual([c.name for c in tree.children(self.cars.pk)], ["SUV"])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_category_tree().resolve("cars/suv").name, "SUV")
+        Category.objects.create(name="Vans", slug="vans", parent=self.cars)
+        self.assertEqual([c.name for c in get_category_tree().children(self.cars.pk)], ["SUV", "Vans"])
+        self.cars.delete()
+        self.assertEqual(get_category_tree().roots, [])
+
+    def test_version_bumped_elsewhere_invalidates_this_process(self):
+        get_category_tree()
+        Category.objects.filter(pk=self.cars.pk).update(name="Autos")  # no signal
+        self.assertEqual(get_category_tree().roots[0].name, "Cars")
+        bump_tree_version()  # as another worker's save would, through the shared cache
+        self.assertEqual(get_category_tree().roots[0].name, "Autos")
+
+    def test_context_processor_is_lazy(self):
+        request = RequestFactory().get("/")
+        with self.assertNumQueries(0):
+            Template("no navbar").render(RequestContext(request))
+        with self.assertNumQueries(1):
+            self.assertEqual(Template("{{ catalog_root_categories|length }}").render(RequestContext(request)), "1")
+
+
+class CategoryPathTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        self.cars = Category.objects.create(name="Cars", slug="cars")
+        self.suv = Category.objects.create(name="SUV", slug="suv", parent=self.cars)
+        self.electric = Category.objects.create(name="Electric", slug="electric", parent=self.suv)
+        for category in (self.cars, self.suv, self.electric):
+            car = Car.objects.create(vendor=self.vendor, make="VW", model=category.slug, year=2020, price=1)
+            make_listing(car, category, f"in-{category.slug}")
+
+    def browse(self, path):
+        resp = self.client.get(reverse("catalog:category", args=[path]))
+        return sorted(l.slug for l in resp.context["listings"]) if resp.status_code == 200 else resp.status_code
+
+    def test_subtree_browse_by_nested_path(self):
+        self.assertEqual(self.browse("cars"), ["in-cars", "in-electric", "in-suv"])
+        self.assertEqual(self.browse("cars/suv"), ["in-electric", "in-suv"])
+        self.assertEqual(self.browse("suv"), 404)
+
+    def test_move_reroots_descendants_and_listing_paths(self):
+        trucks = Category.objects.create(name="Trucks", slug="trucks")
+        self.suv.parent = trucks
+        self.suv.save()
+        self.assertEqual(Category.objects.get(pk=self.electric.pk).path, "trucks/suv/electric/")
+        self.assertEqual(Listing.objects.get(slug="in-electric").category_path, "trucks/suv/electric/")
+        self.assertEqual(self.browse("trucks"), ["in-electric", "in-suv"])
+        self.assertEqual(self.browse("cars"), ["in-cars"])
+
+    def test_cycles_and_oversized_paths_are_rejected(self):
+        for parent in (self.suv, self.electric):
+            self.suv.parent = parent
+            with self.assertRaises(ValidationError):
+                self.suv.save()
+        self.assertEqual(Category.objects.get(pk=self.suv.pk).path, "cars/suv/")
+
+        node = None
+        with self.assertRaises(ValidationError):  # 5 x 51 characters fit in 255, the 6th level does not
+            for i in range(6):
+                node = Category.objects.create(name=f"L{i}", slug=f"{i}" * 50, parent=node)
+        self.assertEqual(node.path.count("/"), 5)
+        node = self.electric
+        with self.assertRaises(ValidationError):
+            for i in range(6):
+                node = Category.objects.create(name=f"D{i}", slug=f"d{i}", parent=node)
+        self.assertEqual(node.path.count("/"), 8)
+
+
+class CategoryFixtureTests(TestCase):
+    fixtures = ["categories"]
+
+    def test_fixture_rows_carry_their_paths(self):
+        # loaddata saves raw, skipping Category.save(), so the fixture must spell the paths out
+        for category in Category.objects.select_related("parent"):
+            self.assertEqual(category.path, category.build_path())
+        self.assertEqual(get_category_tree().resolve("rentals/hotels").name, "Hotels")
+
+
+class CarFacetTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        cars = Category.objects.create(name="Cars", slug="cars")
+        specs = [
+            ("golf", "VW", "Golf", 2012, 9000, "PETROL"), ("polo", "VW", "Polo", 2018, 12000, "DIESEL"),
+            ("zoe", "Renault", "Zoe", 2021, 15000, "ELECTRIC"),
+        ]
+        for slug, make, model, year, price, fuel in specs:
+            car = Car.objects.create(vendor=self.vendor, make=make, model=model, year=year, price=price, fuel_type=fuel)
+            make_listing(car, cars, slug)
+
+    def browse(self, **params):
+        resp = self.client.get(reverse("catalog:listing_list"), {"type": "CAR", **params})
+        self.assertEqual(resp.status_code, 200)
+        facets = {f["name"]: {o["label"]: o["count"] for o in f["options"]} for f in resp.context["facets"]}
+        return sorted(l.slug for l in resp.context["listings"]), facets
+
+    def test_filters_and_counts_exclude_their_own_facet(self):
+        slugs, facets = self.browse(make="VW", year_min="2015")
+        self.assertEqual(slugs, ["polo"])
+        self.assertEqual(facets["make"], {"VW": 1, "Renault": 1})  # other makes stay selectable
+        self.assertEqual(facets["year"]["2015–2019"], 1)
+        self.assertEqual(facets["year"]["2010–2014"], 1)  # year filter not applied to its own counts
+        self.assertEqual(facets["fuel_type"], {"Diesel": 1})
+
+    def test_malformed_numbers_are_ignored(self):
+        everything = self.browse()[0]
+        for value in ("NaN", "sNaN", "Infinity", "-inf", "abc", "1e400"):
+            self.assertEqual(self.browse(year_min=value, price_max=value, mileage_min=value)[0], everything, value)
+
+
+class PropertyGeoTests(SellerFixtureMixin, TestCase):
+    PLACES = {"berlin": (52.5200, 13.4050), "potsdam": (52.3906, 13.0645), "hamburg": (53.5511, 9.9937)}
+
+    def setUp(self):
+        for title, (lat, lng) in self.PLACES.items():
+            Property.objects.create(vendor=self.vendor, title=title, address="Str. 1", city=title, lat=lat, lng=lng)
+        Property.objects.create(vendor=self.vendor, title="nowhere", address="Str. 1", city="?")
+
+    def test_geohash_matches_reference_encoding(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744), "u4pruydqq")
+        self.assertEqual(Property.objects.get(title="berlin").geohash[:5], "u33dc")
+        self.assertEqual(Property.objects.get(title="nowhere").geohash, "")
+
+    def test_near_filters_by_radius_and_orders_by_distance(self):
+        found = list(Property.objects.near(52.5, 13.3, 40))
+        self.assertEqual([p.title for p in found], ["berlin", "potsdam"])
+        expected = haversine_km(52.5, 13.3, *self.PLACES["potsdam"])
+        self.assertAlmostEqual(found[1].distance_km, expected, places=3)
+        self.assertEqual([p.title for p in Property.objects.near(53.55, 10.0, 5)], ["hamburg"])
+
+    def test_within_viewport(self):
+        titles = Property.objects.within(52.0, 12.5, 53.0, 14.0).values_list("title", flat=True)
+        self.assertEqual(sorted(titles), ["berlin", "potsdam"])
+        self.assertFalse(Property.objects.within(0.0, 0.0, 1.0, 1.0).exists())
+
+
+class ListingIndexTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Cars", slug="cars")
+        self.car = Car.objects.create(vendor=self.vendor, make="VW", model="Golf", year=2019, price=9000)
+        self.listing = make_listing(self.car, self.category, "golf")
+
+    def test_columns_follow_content_object(self):
+        self.assertEqual((self.listing.price, self.listing.year), (9000, 2019))
+        self.car.price = 8500
+        self.car.save()
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.price, 8500)
+
+    def test_migration_backfills_existing_listings(self):
+        home = Property.objects.create(
+            vendor=self.vendor, title="Flat", address="Str. 1", city="Berlin", purpose="RENT",
+            monthly_rent=900, bedrooms=2, year_built=1990,
+        )
+        make_listing(home, self.category, "flat")
+        Listing.objects.update(price=None, city="", year=None, bedrooms=None)
+        migration = importlib.import_module("catalog.migrations.0012_listing_browse_columns")
+        migration.fill_browse_columns(apps, None, batch_size=1)
+        rows = dict((slug, rest) for slug, *rest in Listing.objects.values_list("slug", "price", "city", "year", "bedrooms"))
+        self.assertEqual(rows, {"golf": [9000, "", 2019, None], "flat": [900, "Berlin", 1990, 2]})
+
+    def test_product_price_change_reindexes_only_its_groups(self):
+        shirt = Product.objects.create(vendor=self.vendor, name="Shirt", sku="SH", base_price=20)
+        sock = Product.objects.create(vendor=self.vendor, name="Sock", sku="SO", base_price=5)
+        groups = [ProductGroup.objects.create(vendor=self.vendor, title=t) for t in ("shirts", "socks")]
+        groups[0].products.add(shirt)
+        groups[1].products.add(sock)
+        shirts, socks = (make_listing(g, self.category, g.title) for g in groups)
+        stamp = socks.updated_at
+        shirt.base_price = 15
+        shirt.save()
+        shirts.refresh_from_db()
+        socks.refresh_from_db()
+        self.assertEqual(shirts.price, 15)
+        self.assertEqual(socks.updated_at, stamp)
+        shirt.delete()
+        shirts.refresh_from_db()
+        self.assertIsNone(shirts.price)
+
+    def test_vendor_and_category_reindex_only_on_indexed_changes(self):
+        stamp = self.listing.updated_at
+        vendor = Vendor.objects.get(pk=self.vendor.pk)
+        vendor.bio = "New bio"
+        vendor.save()
+        category = Category.objects.get(pk=self.category.pk)
+        category.save()
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.updated_at, stamp)
+        vendor.display_name = "Autohaus"
+        vendor.save()
+        category.name = "Motors"
+        category.save()
+        self.listing.refresh_from_db()
+        self.assertIn("Autohaus", self.listing.search_document)
+        self.assertIn("Motors", self.listing.search_document)
+
+    def test_price_sort_stays_within_one_currency(self):
+        dollars = Car.objects.create(vendor=self.vendor, make="VW", model="Polo", year=2020, price=100)
+        make_listing(dollars, self.category, "polo", currency="USD")
+        url = reverse("catalog:listing_list")
+        eur = [l.slug for l in self.client.get(url, {"sort": "price"}).context["listings"]]
+        usd = [l.slug for l in self.client.get(url, {"sort": "price", "currency": "USD"}).context["listings"]]
+        self.assertEqual((eur, usd), (["golf"], ["polo"]))
+
+
+class ProductListingCreateTests(SellerFixtureMixin, TestCase):
+    def post_products(self, rows):
+        data = {
+            "type": "PRODUCT", "title": "Bundle", "currency": "EUR",
+            "products-TOTAL_FORMS": str(len(rows)), "products-INITIAL_FORMS": "0",
+            "products-MIN_NUM_FORMS": "1", "products-MAX_NUM_FORMS": "1000",
+        }
+        for i, (name, sku) in enumerate(rows):
+            data.update({f"products-{i}-name": name, f"products-{i}-sku": sku, f"products-{i}-price": "9.99"})
+        return self.client.post(reverse("catalog:seller_listing_create"), data)
+
+    def test_query_count_independent_of_row_count(self):
+        self.client.force_login(self.user)
+        self.post_products([("Warm-up", "")])  # category + content type caches
+        counts = []
+        for n in (1, 40):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.post_products([(f"Item {n}-{i}", "") for i in range(n)])
+            self.assertEqual(resp.status_code, 302)
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+        group = Listing.objects.latest("pk").content_object
+        self.assertEqual(group.products.count(), 40)
+
+    def test_sku_taken_concurrently_is_reported_not_500(self):
+        Product.objects.create(vendor=self.vendor, name="Old", sku="RACE")
+        self.client.force_login(self.user)
+        # the other insert lands after the up-front check
+        with mock.patch("catalog.views_seller._assign_skus", return_value=True):
+            resp = self.post_products([("New", "FREE"), ("Other", "RACE")])
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "This item code is already in use.")
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertFalse(ProductGroup.objects.exists())
+
+    def test_service_listing_gets_the_sellers_vendor(self):
+        self.client.force_login(self.user)
+        data = {"type": "SERVICE", "title": "Logo design", "currency": "EUR", "name": "Logo",
+                "pricing_type": "HOURLY", "min_hours": 1}
+        resp = self.client.post(reverse("catalog:seller_listing_create"), data)
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(Service.objects.get().vendor, self.vendor)
+
+    def test_taken_sku_is_reported_and_nothing_is_created(self):
+        Product.objects.create(vendor=self.vendor, name="Old", sku="TAKEN")
+        self.client.force_login(self.user)
+        resp = self.post_products([("New", "TAKEN"), ("Other", "")])
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertFalse(Listing.objects.exists())
+
+
+class ProductImporterTests(SellerFixtureMixin, TestCase):
+    CSV = (
+        "name,sku,price,color,size,variant_sku,variant_price,quantity\n"
+        "Shirt,SH-1,10.00,red,M,SH-1-RM,,5\n"
+        "Shirt,SH-1,11.00,blue,L,SH-1-BL,12.50,3\n"
+        "Broken,,abc,,,,,\n"
+    )
+
+    def run_import(self, vendor=None, batch_size=500):
+        rows = iter_rows(io.BytesIO(self.CSV.encode()), "products.csv")
+        return ProductImporter(vendor or self.vendor, batch_size=batch_size).run(rows)
+
+    def test_upserts_by_sku_and_reports_bad_rows(self):
+        result = self.run_import(batch_size=1)
+        self.assertEqual((result.imported, result.failed), (2, 1))
+        self.assertEqual(result.errors[0][0], 4)
+        self.run_import()  # re-import is an update, not a duplicate
+        self.assertEqual(Product.objects.get().base_price, 11)
+        variant = ProductVariant.objects.get(sku="SH-1-BL")
+        self.assertEqual((variant.price, variant.inventory.quantity), (Decimal("12.50"), 3))
+
+    def test_other_vendors_skus_are_not_overwritten(self):
+        self.run_import()
+        other = Vendor.objects.create(owner=User.objects.create_user("other"), display_name="O", slug="o")
+        result = self.run_import(vendor=other)
+        self.assertEqual(result.imported, 0)
+        self.assertEqual(Product.objects.get().vendor, self.vendor)
+
+    def test_reimport_reindexes_group_listings(self):
+        self.run_import()
+        group = ProductGroup.objects.create(vendor=self.vendor, title="Shirts")
+        group.products.set(Product.objects.all())
+        listing = make_listing(group, Category.objects.create(name="Fashion", slug="fashion"), "shirts")
+        self.assertEqual(listing.price, 11)
+        self.CSV = self.CSV.replace("11.00", "8.00")
+        self.run_import()
+        listing.refresh_from_db()
+        self.assertEqual(listing.price, 8)
+
+    def test_non_utf8_csv_is_rejected_before_any_batch(self):
+        data = (self.CSV + "Caf\u00e9,CF-1,3.00,,,,,\n").encode("latin-1")
+        with self.assertRaises(ImportFileError):
+            ProductImporter(self.vendor, batch_size=1).run(iter_rows(io.BytesIO(data), "products.csv"))
+        self.assertFalse(Product.objects.exists())
+
+    def test_corrupt_xlsx_is_reported_on_the_form(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile("products.xlsx", b"PK\x03\x04 not really a workbook")
+        resp = self.client.post(reverse("catalog:seller_product_import"), {"file": upload})
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "damaged or not an Excel workbook")
+
+    @unittest.skipUnless(openpyxl, "openpyxl is not installed")
+    def test_xlsx_rows(self):
+        wb = openpyxl.Workbook()
+        for line in self.CSV.splitlines():
+            wb.active.append(line.split(","))
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        result = ProductImporter(self.vendor).run(iter_rows(buf, "products.XLSX"))
+        self.assertEqual((result.imported, result.failed), (2, 1))
+        self.assertEqual(ProductVariant.objects.get(sku="SH-1-RM").inventory.quantity, 5)
+
+
+def make_variant(vendor, sku, stock):
+    product = Product.objects.create(vendor=vendor, name=sku, sku=sku)
+    variant = ProductVariant.objects.create(product=product, sku=f"{sku}-V", price=1)
+    Inventory.objects.create(variant=variant, quantity=stock)
+    return variant
+
+
+class InventoryReservationTests(SellerFixtureMixin, TestCase):
+    def stock(self, variant):
+        return Inventory.objects.get(variant=variant).quantity
+
+    def test_multi_variant_reserve_is_all_or_nothing(self):
+        a, b = make_variant(self.vendor, "A", 5), make_variant(self.vendor, "B", 1)
+        with self.assertRaises(InsufficientStock):
+            reserve({a.pk: 2, b.pk: 2})
+        self.assertEqual((self.stock(a), self.stock(b)), (5, 1))
+        token = reserve({a.pk: 2, b.pk: 1})
+        self.assertEqual((self.stock(a), self.stock(b)), (3, 0))
+        self.assertEqual(commit(token), 2)
+        self.assertEqual(release(token), 0)  # committed stock stays sold
+
+    def test_release_and_expiry_return_stock_once(self):
+        v = make_variant(self.vendor, "C", 3)
+        token = reserve({v.pk: 3})
+        self.assertEqual((release(token), release(token)), (1, 0))
+        self.assertEqual(self.stock(v), 3)
+        token = reserve({v.pk: 2}, ttl=timedelta(seconds=-1))
+        self.assertEqual(commit(token), 0)
+        self.assertEqual(expire_stale(timezone.now()), 1)
+        self.assertEqual(self.stock(v), 3)
+
+
+class InventoryConcurrencyTests(TransactionTestCase):
+    """Parallel workers hammer one variant; sold units must equal the starting stock exactly."""
+
+    STOCK, WORKERS, ATTEMPTS = 25, 8, 10
+
+    def test_no_oversell_under_parallel_workers(self):
+        user = User.objects.create_user("stress")
+        vendor = Vendor.objects.create(owner=user, display_name="S", slug="s")
+        variant = make_variant(vendor, "HOT", self.STOCK)
+        sold, lock = [], threading.Lock()
+        barrier = threading.Barrier(self.WORKERS)
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(self.ATTEMPTS):
+                    while True:
+                        try:
+                            token = reserve({variant.pk: 1})
+                        except InsufficientStock:
+                            break
+                        except OperationalError:  # SQLite write lock; Postgres never gets here
+                            continue
+                        with lock:
+                            sold.append(token)
+                        break
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.WORKERS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(sold), self.STOCK)
+        self.assertEqual(Inventory.objects.get(variant=variant).quantity, 0)
+        self.assertEqual(StockReservation.objects.count(), self.STOCK)
+
+
+class AvailabilityTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        self.homes = [
+            Property.objects.create(vendor=self.vendor, title=f"Home {i}", address="Str. 1", city="Berlin")
+            for i in range(3)
+        ]
+
+    def test_overlaps_are_rejected_and_checkout_day_is_free(self):
+        home = self.homes[0]
+        create_booking(home, self.user, date(2030, 5, 1), date(2030, 5, 4), total_price=300)
+        with self.assertRaises(BookingUnavailable):
+            create_booking(home, self.user, date(2030, 5, 3), date(2030, 5, 6), total_price=300)
+        create_booking(home, self.user, date(2030, 5, 4), date(2030, 5, 6), total_price=200)
+
+    def test_free_among_uses_one_query(self):
+        create_booking(self.homes[1], self.user, date(2030, 6, 5), date(2030, 6, 8), total_price=300)
+        ids = [h.pk for h in self.homes]
+        with self.assertNumQueries(1):
+            free = free_among(Property, ids, date(2030, 6, 6), date(2030, 6, 7))
+        self.assertEqual(free, {self.homes[0].pk, self.homes[2].pk})
+
+    def test_calendar_tracks_create_cancel_and_year_boundaries(self):
+        home = self.homes[2]
+        window = (date(2030, 12, 30), date(2031, 1, 3))
+        booking = create_booking(home, self.user, date(2030, 12, 31), date(2031, 1, 2), total_price=200)
+        self.assertEqual(booked_units(home, *window), [0, 1, 1, 0])
+        booking = Booking.objects.get(pk=booking.pk)
+        booking.status = "CANCELED"
+        booking.save()
+        with self.assertNumQueries(1):  # calendar rows only, never Booking
+            self.assertEqual(booked_units(home, *window), [0, 0, 0, 0])
+
+    def test_availability_reads_calendar_not_bookings(self):
+        home = self.homes[0]
+        with CaptureQueriesContext(connection) as ctx:
+            create_booking(home, self.user, date(2030, 7, 1), date(2030, 7, 3), total_price=200)
+        self.assertFalse([q for q in ctx.captured_queries if q["sql"].startswith("SELECT") and "catalog_booking" in q["sql"]])
+        with self.assertRaises(BookingUnavailable):
+            create_booking(home, self.user, date(2030, 7, 2), date(2030, 7, 4), total_price=200)
+
+    def test_deferred_loads_keep_calendar_in_step(self):
+        home = self.homes[0]
+        window = (date(2030, 8, 1), date(2030, 8, 3))
+        pk = create_booking(home, self.user, *window, total_price=200).pk
+        booking = Booking.objects.only("id").get(pk=pk)
+        booking.refresh_from_db(fields=["status"])
+        booking.status = "CANCELED"
+        booking.save()
+        self.assertEqual(booked_units(home, *window), [0, 0])
+        booking = Booking.objects.defer("status").get(pk=pk)
+        booking.status = "CONFIRMED"
+        booking.save(update_fields=["status"])
+        self.assertEqual(booked_units(home, *window), [1, 1])
+
+
+class PricingTests(SellerFixtureMixin, TestCase):
+    def test_batch_prices_and_total_validation(self):
+        flat = Property.objects.create(
+            vendor=self.vendor, title="Flat", address="Str. 1", city="Berlin",
+            purpose=Property.Purpose.RENT, monthly_rent=Decimal("1000.00"),
+        )
+        hourly = Service.objects.create(vendor=self.vendor, name="Cleaning", hourly_rate=Decimal("20.00"), min_hours=3)
+        mixed = Service.objects.create(
+            vendor=self.vendor, name="Move", pricing_type=Service.PricingType.MIXED,
+            hourly_rate=Decimal("10.00"), base_fixed_price=Decimal("50.00"),
+        )
+        package = ServicePackage.objects.create(service=mixed, title="Big move", price=Decimal("400.00"))
+        with self.assertNumQueries(2):
+            prices = price_service_lines([
+                (hourly.pk,), (hourly.pk, None, 5), (mixed.pk, None, 2), (mixed.pk, package.pk), (hourly.pk, package.pk),
+            ])
+        self.assertEqual(prices, [Decimal("60.00"), Decimal("100.00"), Decimal("70.00"), Decimal("400.00"), None])
+
+        booking = create_booking(flat, self.user, date(2030, 3, 1), date(2030, 3, 4))
+        self.assertEqual(booking.total_price, Decimal("100.00"))
+        with self.assertRaises(PriceMismatch):
+            create_booking(flat, self.user, date(2030, 3, 5), date(2030, 3, 6), total_price=1)
+
+
+class ServiceInboxTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        self.service = Service.objects.create(vendor=self.vendor, name="Design", hourly_rate=Decimal("50.00"))
+        self.buyer = User.objects.create_user("buyer")
+        self.requests = [
+            ServiceRequest.objects.create(service=self.service, buyer=self.buyer, brief=f"Job {i}") for i in range(3)
+        ]
+
+    def test_counters_follow_reads_transitions_and_deletes(self):
+        self.assertEqual(inbox_counts(self.vendor)[ServiceRequest.PENDING], (3, 3))
+        page = inbox_page(self.vendor)
+        self.assertEqual([r.pk for r in page], [r.pk for r in reversed(self.requests)])
+        mark_read(self.vendor, page.object_list[:1])
+        transition(self.requests[0], ServiceRequest.QUOTED, quoted_price=Decimal("120.00"))
+        self.requests[1].delete()
+        counts = inbox_counts(self.vendor)
+        self.assertEqual((counts[ServiceRequest.PENDING], counts[ServiceRequest.QUOTED]), ((1, 0), (1, 1)))
+
+    def test_stale_version_loses(self):
+        mine = self.requests[0]
+        theirs = ServiceRequest.objects.get(pk=mine.pk)
+        transition(theirs, ServiceRequest.REJECTED)
+        with self.assertRaises(StaleRequest):
+            transition(mine, ServiceRequest.QUOTED, quoted_price=Decimal("10.00"))
+        self.assertEqual(ServiceRequest.objects.get(pk=mine.pk).status, ServiceRequest.REJECTED)
+        with self.assertRaises(InvalidTransition):
+            transition(theirs, ServiceRequest.ACCEPTED)
+
+    def test_inbox_view_marks_read_on_post_only(self):
+        self.client.force_login(self.user)
+        url = reverse("catalog:seller_service_inbox")
+        resp = self.client.get(url)
+        self.assertContains(resp, "Job 2")
+        self.assertEqual(inbox_counts(self.vendor)[ServiceRequest.PENDING], (3, 3))
+        ids = [r.pk for r in self.requests[:2]]
+        resp = self.client.post(f"{url}?status=PENDING", {"action": "read", "request_id": ids})
+        self.assertRedirects(resp, f"{url}?status=PENDING", fetch_redirect_response=False)
+        self.assertEqual(inbox_counts(self.vendor)[ServiceRequest.PENDING], (3, 1))
+
+    def test_deferred_load_keeps_counters_in_step(self):
+        req = ServiceRequest.objects.only("id").get(pk=self.requests[0].pk)
+        req.refresh_from_db(fields=["brief"])
+        req.is_read = True
+        req.save()
+        self.assertEqual(inbox_counts(self.vendor)[ServiceRequest.PENDING], (3, 2))
+
+
+class AdminChangelistQueryTests(SellerFixtureMixin, TestCase):
+    CHANGELISTS = ["productgroup", "productvariant", "inventory", "booking", "servicerequest", "listing"]
+
+    def add_rows(self, n):
+        start = Product.objects.count()
+        for i in range(start, start + n):
+            variant = make_variant(self.vendor, f"P{i}", 1)
+            group = ProductGroup.objects.create(vendor=self.vendor, title=f"Group {i}")
+            group.products.add(variant.product)
+            Listing.objects.create(
+                title=f"Group {i}", slug=f"group-{i}", type="PRODUCT", vendor=self.vendor,
+                category=self.category, content_object=group,
+            )
+            home = Property.objects.create(vendor=self.vendor, title=f"Home {i}", address="Str. 1", city="Berlin")
+            car = Car.objects.create(vendor=self.vendor, make="VW", model="Golf", year=2020, price=1)
+            for bookable in (home, car):
+                create_booking(bookable, self.user, date(2030, 1, 1), date(2030, 1, 2), total_price=1)
+            ServiceRequest.objects.create(service=self.service, buyer=self.user, brief=f"Job {i}")
+
+    def changelist_queries(self, name):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse(f"admin:catalog_{name}_changelist"))
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx)
+
+    def test_changelists_run_constant_queries(self):
+        self.category = Category.objects.create(name="Products", slug="products")
+        self.service = Service.objects.create(vendor=self.vendor, name="Design")
+        self.client.force_login(User.objects.create_superuser("admin", password="pw"))
+        self.add_rows(2)
+        small = {name: self.changelist_queries(name) for name in self.CHANGELISTS}
+        self.add_rows(8)
+        large = {name: self.changelist_queries(name) for name in self.CHANGELISTS}
+        self.assertEqual(small, large)
+
+
+class ModerationTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Products", slug="products")
+        group = ProductGroup.objects.create(vendor=self.vendor, title="Group")
+        self.listings = [
+            Listing.objects.create(
+                title=f"L{i}", slug=f"l-{i}", type="PRODUCT", vendor=self.vendor, category=self.category,
+                content_object=group, is_active=False, status=status,
+            )
+            for i, status in enumerate(["PENDING"] * 5 + ["DRAFT"])
+        ]
+
+    def test_bulk_approve_skips_illegal_moves_and_audits(self):
+        ids = [l.pk for l in self.listings]
+        with self.assertNumQueries(2 * 5):  # per batch: SELECT ... FOR UPDATE, UPDATE, INSERT + savepoint pair
+            moved = moderate(ids, Listing.Status.PUBLISHED, self.user, batch_size=3)
+        self.assertEqual(moved, 5)
+        published = Listing.objects.filter(status="PUBLISHED", is_active=True, published_at__isnull=False)
+        self.assertEqual(published.count(), 5)
+        self.assertEqual(Listing.objects.get(pk=self.listings[-1].pk).status, "DRAFT")
+        self.assertEqual(ListingModeration.objects.filter(from_status="PENDING", to_status="PUBLISHED").count(), 5)
+
+    def test_seller_submit_goes_through_state_machine(self):
+        draft = self.listings[-1]
+        self.client.force_login(self.user)
+        self.client.post(reverse("catalog:seller_listing_review", args=[draft.pk]), {"action": "submit"})
+        draft.refresh_from_db()
+        self.assertEqual(draft.status, "PENDING")
+        self.assertIsNotNone(draft.submitted_at)
+        with self.assertRaises(IllegalListingMove):
+            move_listing(draft, Listing.Status.DRAFT)
+
+    def test_admin_rejects_through_moderation_only(self):
+        admin_user = User.objects.create_superuser("admin", password="pw")
+        self.client.force_login(admin_user)
+        change = self.client.get(reverse("admin:catalog_listing_change", args=[self.listings[0].pk]))
+        self.assertNotIn('name="status"', change.content.decode())
+        url = reverse("admin:catalog_listing_changelist")
+        ids = [l.pk for l in self.listings[:2]]
+        resp = self.client.post(url, {"action": "reject_listings", "_selected_action": ids})
+        self.assertContains(resp, "2 listings selected.")
+        self.client.post(url, {"action": "reject_listings", "_selected_action": ids, "apply": "1", "review_notes": "Blurry"})
+        self.assertEqual(Listing.objects.filter(status="REJECTED", review_notes="Blurry").count(), 2)
+
+
+class ListingDetailCacheTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.car = Car.objects.create(vendor=self.vendor, make="VW", model="Golf", year=2020, price=9000)
+        self.listing = Listing.objects.create(
+            title="Golf", slug="golf", type="CAR", vendor=self.vendor, content_object=self.car,
+            category=Category.objects.create(name="Cars", slug="cars"), status="PUBLISHED",
+        )
+        self.url = reverse("catalog:listing_detail", args=["golf"])
+
+    def test_fragment_cache_and_conditional_get(self):
+        first = self.client.get(self.url)
+        self.assertContains(first, "9000")
+        with self.assertNumQueries(1):  # version stamp only
+            self.assertContains(self.client.get(self.url), "9000")
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.car.price = 8500
+        self.car.save()  # content object change bumps the stamp
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertContains(changed, "8500")
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+
+class LatestListingsSnapshotTests(SellerFixtureMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Cars", slug="cars")
+
+    def add_listing(self, slug):
+        car = Car.objects.create(vendor=self.vendor, make="VW", model="Golf", year=2020, price=1)
+        return Listing.objects.create(title=slug, slug=slug, type="CAR", vendor=self.vendor, category=self.category, content_object=car)
+
+    def test_served_from_snapshot_until_a_listing_changes(self):
+        self.add_listing("first")
+        self.assertEqual([r["slug"] for r in latest_listings("en")], ["first"])
+        with self.assertNumQueries(0):
+            latest_listings("en")
+        self.add_listing("second")
+        self.assertEqual([r["slug"] for r in latest_listings("en")], ["second", "first"])
+
+    def test_stale_snapshot_is_rebuilt_by_one_caller(self):
+        self.add_listing("first")
+        latest_listings("en")
+        bump_listings_version()
+        cache.add(f"{LATEST_KEY.format(lang='en', country='-', limit=8)}:rebuild", 1)  # another worker is on it
+        with self.assertNumQueries(0):
+            self.assertEqual([r["slug"] for r in latest_listings("en")], ["first"])
+
+    def test_only_published_changes_mark_snapshots_stale(self):
+        draft = self.add_listing("draft")
+        draft.is_active, draft.status = False, Listing.Status.DRAFT
+        draft.save()
+        version = listings_version()
+        draft = Listing.objects.get(pk=draft.pk)
+        draft.title = "Still a draft"
+        draft.save()
+        draft.content_object.price = 2
+        draft.content_object.save()
+        move_listing(draft, Listing.Status.PENDING)
+        self.assertEqual(listings_version(), version)
+        moderate([draft.pk], Listing.Status.PUBLISHED)
+        self.assertNotEqual(listings_version(), version)
+        version = listings_version()
+        Listing.objects.get(pk=draft.pk).delete()
+        self.assertNotEqual(listings_version(), version)
+
+
+class SlugAllocatorTests(SellerFixtureMixin, TestCase):
+    def test_batch_is_unique_and_keeps_suffix_when_truncated(self):
+        long_title = "x" * 200
+        Vendor.objects.create(owner=User.objects.create_user("o2"), display_name="Shop 2", slug="shop-2")
+        Vendor.objects.create(owner=User.objects.create_user("o3"), display_name="Shopping", slug="shop-ping-9")
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(Vendor, ["Shop", "Shop", "", long_title, long_title], fallback="store")
+        self.assertEqual(slugs[:3], ["shop-3", "shop-4", "store"])
+        self.assertEqual(slugs[3:], ["x" * 140, "x" * 138 + "-2"])
+
+    def test_listing_create_gets_unique_slugs(self):
+        self.client.force_login(self.user)
+        data = {
+            "type": "PRODUCT", "title": "Logo design " * 6, "currency": "EUR",
+            "products-TOTAL_FORMS": "1", "products-INITIAL_FORMS": "0",
+            "products-MIN_NUM_FORMS": "1", "products-MAX_NUM_FORMS": "1000",
+            "products-0-name": "Logo", "products-0-sku": "", "products-0-price": "9.99",
+        }
+        for _ in range(2):
+            self.client.post(reverse("catalog:seller_listing_create"), data)
+        slugs = list(Listing.objects.order_by("pk").values_list("slug", flat=True))
+        self.assertEqual(len(set(slugs)), 2)
+        self.assertTrue(slugs[1].endswith("-2") and len(slugs[1]) <= 50)
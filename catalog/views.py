@@ -1,22 +1,88 @@
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
-from .models import Listing, Category
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+from .models import CURRENCY_CHOICES, Listing
+from .categories import get_category_tree
+from .facets import CarFacets
+from .pagination import keyset_paginate, DEFAULT_ORDERING
+from .search import search_listings, SEARCH_ORDERING
+
+# sorts on denormalized Listing columns; unpriced listings and other currencies drop out of price sorts
+SORTS = {"price": ("price", "id"), "-price": ("-price", "-id")}
+CURRENCIES = {code for code, _label in CURRENCY_CHOICES}
+
+# rendered detail fragments, keyed on Listing.updated_at so a change just stops hitting old keys
+DETAIL_KEY = "catalog:listing-detail:{pk}:{stamp}:{lang}"
+DETAIL_TTL = 60 * 60 * 24
 
 def listing_list(request):
     qs = Listing.objects.select_related("vendor", "category").filter(is_active=True)
     t = request.GET.get("type")
     q = request.GET.get("q")
+    ordering = DEFAULT_ORDERING
     if t: qs = qs.filter(type=t)
-    if q: qs = qs.filter(title__icontains=q)
-    return render(request, "catalog/listing_list.html", {"listings": qs, "type": t, "q": q})
+    if q: qs, ordering = search_listings(qs, q), SEARCH_ORDERING
+    city = request.GET.get("city")
+    if city: qs = qs.filter(city=city)
+    sort = request.GET.get("sort")
+    if sort in SORTS:
+        # prices are only comparable within one currency
+        currency = request.GET.get("currency")
+        if currency not in CURRENCIES: currency = Listing._meta.get_field("currency").default
+        qs, ordering = qs.filter(price__isnull=False, currency=currency), SORTS[sort]
+    facets = None
+    if t == Listing.Type.CAR:
+        car_facets = CarFacets(request.GET, qs)
+        facets = car_facets.counts()
+        qs = car_facets.filter_listings(qs)
+    page = keyset_paginate(qs, request.GET.get("cursor"), ordering)
+    return render(request, "catalog/listing_list.html", {"listings": page, "page": page, "type": t, "q": q, "facets": facets})
+
+def listing_by_category(request, path):
+    cat = get_category_tree().resolve(path)
+    if cat is None:
+        raise Http404("No category at this path.")
+    # whole subtree: prefix range over the listings' copy of the materialized path
+    qs = Listing.objects.select_related("vendor", "category").filter(is_active=True, category_path__startswith=cat.path)
+    page = keyset_paginate(qs, request.GET.get("cursor"))
+    return render(request, "catalog/listing_list.html", {"listings": page, "page": page, "category": cat})
+
+def _detail_stamp(request, slug):
+    """(pk, title, updated_at) of an active listing, looked up once per request; None if missing."""
+    if not hasattr(request, "_listing_stamp"):
+        request._listing_stamp = (
+            Listing.objects.filter(slug=slug, is_active=True).values_list("pk", "title", "updated_at").first()
+        )
+    return request._listing_stamp
+
+
+def _detail_etag(request, slug):
+    stamp = _detail_stamp(request, slug)
+    if stamp is None:
+        return None
+    pk, _title, updated_at = stamp
+    # the page around the fragment shows the navbar, so the user is part of the version
+    return f"{pk}-{int(updated_at.timestamp() * 1e6)}-{get_language()}-{request.user.pk or 0}"
+
+
+def _detail_last_modified(request, slug):
+    stamp = _detail_stamp(request, slug)
+    return stamp[2] if stamp else None
 
-def listing_by_category(request, slug):
-    cat = get_object_or_404(Category, slug=slug, parent__isnull=True)  # root categories for now
-    qs = Listing.objects.select_related("vendor", "category").filter(is_active=True, category=cat)
-    return render(request, "catalog/listing_list.html", {"listings": qs, "category": cat})
 
+@condition(etag_func=_detail_etag, last_modified_func=_detail_last_modified)
 def listing_detail(request, slug):
-    obj = get_object_or_404(
-        Listing.objects.select_related("vendor", "category"),
-        slug=slug, is_active=True
-    )
-    return render(request, "catalog/listing_detail.html", {"listing": obj})
+    stamp = _detail_stamp(request, slug)
+    if stamp is None:
+        raise Http404("No listing matches the given query.")
+    pk, title, updated_at = stamp
+    key = DETAIL_KEY.format(pk=pk, stamp=int(updated_at.timestamp() * 1e6), lang=get_language())
+    body = cache.get(key)
+    if body is None:
+        obj = get_object_or_404(Listing.objects.select_related("vendor", "category").with_content_objects(), pk=pk)
+        body = render_to_string("catalog/includes/listing_body.html", {"listing": obj, "obj": obj.content_object})
+        cache.set(key, body, DETAIL_TTL)
+    return render(request, "catalog/listing_detail.html", {"title": title, "body": body})
@@ -1,18 +1,24 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import IntegrityError, transaction
 from django.shortcuts import render, redirect, get_object_or_404
-from django.utils import timezone
 from django.utils.crypto import get_random_string
 from django.utils.text import slugify
 
 from .models import (
     Listing, Category,
     Product, ProductGroup,
-    Service, Car, Property,
+    Service, ServiceRequest, Car, Property,
 )
+from .pagination import keyset_paginate
+from .importers import ImportFileError, ProductImporter, iter_rows
+from .inbox import INBOX_STATUSES, InvalidTransition, StaleRequest, inbox_counts, inbox_page, mark_read, transition
+from .moderation import InvalidTransition as IllegalListingMove, transition as move_listing
+from .pricing import price_service_requests
+from .slugs import save_with_unique_slug
 from .forms_seller import (
     TypeSelectForm, BaseListingForm,
-    ProductLineFormSet,
+    ProductLineFormSet, ProductImportForm, ServiceRequestActionForm,
     ServiceForm, CarForm, PropertyForm,
 )
 
@@ -41,17 +47,68 @@ def _unique_sku(seed: str) -> str:
 def listing_key(obj):
     return f"{obj.__class__.__name__.lower()}-{obj.pk}"
 
+def _product_forms(pset):
+    return [
+        f for f in pset.forms
+        if getattr(f, "cleaned_data", None) and not f.cleaned_data.get("DELETE")
+    ]
+
+def _assign_skus(forms) -> bool:
+    """Fill in missing SKUs and reject taken ones with a single lookup against Product.sku."""
+    wanted = [(f, f.cleaned_data.get("sku") or "") for f in forms]
+    candidates = [sku or _unique_sku(f.cleaned_data["name"]) for f, sku in wanted]
+    taken = set(Product.objects.filter(sku__in=candidates).values_list("sku", flat=True))
+    seen, ok = set(), True
+    for (f, typed), sku in zip(wanted, candidates):
+        if typed:
+            if sku in taken or sku in seen:
+                f.add_error("sku", "This item code is already in use.")
+                ok = False
+        else:
+            # random suffixes: a regenerated code is checked against the batch; the unique constraint backs the rest
+            while sku in taken or sku in seen:
+                sku = _unique_sku(f.cleaned_data["name"])
+        seen.add(sku)
+        f.cleaned_data["sku"] = sku
+    return ok
+
+def _reject_taken_skus(forms) -> bool:
+    """Flag forms whose SKU exists now; True if any did (the unique constraint fired for them)."""
+    skus = [(f, f.cleaned_data["sku"]) for f in forms]
+    taken = set(Product.objects.filter(sku__in=[sku for _, sku in skus]).values_list("sku", flat=True))
+    for f, sku in skus:
+        if sku in taken:
+            f.add_error("sku", "This item code is already in use.")
+    return bool(taken)
+
+def _create_product_group(vendor, title, forms) -> ProductGroup:
+    """One INSERT for the group, one for all products, one for the M2M rows, whatever the row count."""
+    group = ProductGroup.objects.create(vendor=vendor, title=title)
+    products = Product.objects.bulk_create([
+        Product(
+            vendor=vendor,
+            name=f.cleaned_data["name"],
+            sku=f.cleaned_data["sku"],
+            base_price=f.cleaned_data["price"],
+        )
+        for f in forms
+    ])
+    Through = ProductGroup.products.through
+    Through.objects.bulk_create([Through(productgroup_id=group.pk, product_id=p.pk) for p in products])
+    return group
+
 # ---------- views ----------
 @login_required
 def my_listings(request):
     if not require_seller(request.user):
         return redirect("profiles:seller_onboarding")
     v = request.user.vendor
-    qs = Listing.objects.select_related("category").filter(vendor=v).order_by("-created_at")
+    qs = Listing.objects.select_related("category").filter(vendor=v)
     t = request.GET.get("type")
     if t:
         qs = qs.filter(type=t)
-    return render(request, "catalog/seller/my_listings.html", {"listings": qs, "type": t})
+    page = keyset_paginate(qs, request.GET.get("cursor"))
+    return render(request, "catalog/seller/my_listings.html", {"listings": page, "page": page, "type": t})
 
 @login_required
 def listing_create(request):
@@ -111,42 +168,42 @@ def listing_create(request):
     teaser = base.cleaned_data.get("short_description") or ""
     currency = base.cleaned_data.get("currency") or "EUR"
 
-    if chosen_type == "PRODUCT":
-        group = ProductGroup.objects.create(vendor=vendor, title=title)
-        for f in pset.forms:
-            if not getattr(f, "cleaned_data", None):  # empty row
-                continue
-            if f.cleaned_data.get("DELETE"):
-                continue
-            name = f.cleaned_data["name"]
-            price = f.cleaned_data["price"]
-            sku = f.cleaned_data.get("sku") or _unique_sku(name)
-            prod = Product.objects.create(
+    product_forms = _product_forms(pset) if chosen_type == "PRODUCT" else []
+    if product_forms and not _assign_skus(product_forms):
+        messages.error(request, "Please fix errors below.")
+        return render(request, "catalog/seller/create_fill_forms.html", {
+            "type": chosen_type, "category": category, "base": base, "pformset": pset, "subform": subform,
+        })
+
+    try:
+        with transaction.atomic():
+            if chosen_type == "PRODUCT":
+                obj = _create_product_group(vendor, title, product_forms)
+            else:
+                obj = subform.save(commit=False)
+                obj.vendor = vendor  # hasattr() is False while the FK is unset
+                obj.save()
+
+            listing = Listing(
+                title=title,
+                type=chosen_type,
+                category=category,
                 vendor=vendor,
-                name=name,
-                sku=sku,
-                base_price=price,
+                is_active=False,
+                status=Listing.Status.DRAFT,
+                teaser=teaser,
+                currency=currency,
+                content_object=obj,
             )
-            group.products.add(prod)
-        obj = group
-    else:
-        obj = subform.save(commit=False)
-        if hasattr(obj, "vendor"):
-            obj.vendor = vendor
-        obj.save()
-
-    listing = Listing.objects.create(
-        title=title,
-        slug=slugify(f"{title}-{listing_key(obj)}")[:50],
-        type=chosen_type,
-        category=category,
-        vendor=vendor,
-        is_active=False,
-        status=Listing.Status.DRAFT,
-        teaser=teaser,
-        currency=currency,
-        content_object=obj,
-    )
+            save_with_unique_slug(listing, title, fallback=listing_key(obj))
+    except IntegrityError:
+        # a concurrent insert took one of the item codes after _assign_skus checked them
+        if not product_forms or not _reject_taken_skus(product_forms):
+            raise
+        messages.error(request, "Please fix errors below.")
+        return render(request, "catalog/seller/create_fill_forms.html", {
+            "type": chosen_type, "category": category, "base": base, "pformset": pset, "subform": subform,
+        })
     messages.success(request, "Draft created. Review and submit.")
     return redirect("catalog:seller_listing_review", pk=listing.pk)
 
@@ -159,12 +216,75 @@ def listing_review(request, pk: int):
     if request.method == "POST":
         action = request.POST.get("action")
         if action == "submit":
-            l.status = Listing.Status.PENDING
-            l.submitted_at = timezone.now()
-            l.is_active = False
-            l.save(update_fields=["status", "submitted_at", "is_active"])
-            messages.success(request, "Listing submitted for review.")
+            try:
+                move_listing(l, Listing.Status.PENDING, actor=request.user)
+            except IllegalListingMove:
+                messages.error(request, "This listing cannot be submitted right now.")
+            else:
+                messages.success(request, "Listing submitted for review.")
             return redirect("catalog:seller_my_listings")
         if action == "edit":
             return redirect("catalog:seller_my_listings")
     return render(request, "catalog/seller/review.html", {"listing": l})
+
+@login_required
+def product_import(request):
+    if not require_seller(request.user):
+        return redirect("profiles:seller_onboarding")
+    result = None
+    form = ProductImportForm(request.POST or None, request.FILES or None)
+    if request.method == "POST" and form.is_valid():
+        upload = form.cleaned_data["file"]
+        try:
+            result = ProductImporter(request.user.vendor).run(iter_rows(upload.file, upload.name))
+        except ImportFileError as e:
+            form.add_error("file", str(e))
+        else:
+            if result.failed:
+                messages.warning(request, f"Imported {result.imported} rows, {result.failed} rows need fixing.")
+            else:
+                messages.success(request, f"Imported {result.imported} rows.")
+    return render(request, "catalog/seller/product_import.html", {"form": form, "result": result})
+
+@login_required
+def service_inbox(request):
+    if not require_seller(request.user):
+        return redirect("profiles:seller_onboarding")
+    vendor = request.user.vendor
+    status = request.GET.get("status")
+    if status not in INBOX_STATUSES:
+        status = ServiceRequest.PENDING
+
+    if request.method == "POST" and request.POST.get("action") == "read":
+        ids = [int(i) for i in request.POST.getlist("request_id") if i.isdigit()]
+        mark_read(vendor, list(ServiceRequest.objects.for_vendor(vendor).filter(pk__in=ids, is_read=False)))
+        return redirect(request.get_full_path())
+
+    if request.method == "POST":
+        form = ServiceRequestActionForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            req = get_object_or_404(ServiceRequest.objects.for_vendor(vendor), pk=data["request_id"])
+            req.version = data["version"]  # what the vendor saw, not what is stored now
+            try:
+                if data["action"] == "quote":
+                    transition(req, ServiceRequest.QUOTED,
+                               quoted_price=data["quoted_price"], estimated_days=data["estimated_days"])
+                else:
+                    transition(req, ServiceRequest.REJECTED)
+            except (StaleRequest, InvalidTransition):
+                messages.error(request, "This request changed in the meantime; please check it again.")
+            else:
+                messages.success(request, f"Request #{req.pk} updated.")
+        else:
+            messages.error(request, "Please enter a price to send a quote.")
+        return redirect(f"{request.path}?status={status}")
+
+    page = inbox_page(vendor, status, request.GET.get("cursor"))
+    counts = inbox_counts(vendor)
+    suggested = price_service_requests(page.object_list)
+    rows = [(r, not r.is_read, price) for r, price in zip(page.object_list, suggested)]
+    return render(request, "catalog/seller/service_inbox.html", {
+        "page": page, "rows": rows, "status": status, "unread": [r for r, is_new, _price in rows if is_new],
+        "tabs": [(s, label, counts[s]) for s, label in ServiceRequest.STATUS_CHOICES],
+    })
@@ -1,16 +1,15 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.utils.translation import gettext as _
+from django.utils.translation import get_language, gettext as _
 from django.contrib import messages
-from catalog.models import Listing
+from django_countries import countries
+from catalog.snapshots import latest_listings
 
 
 def index(request):
-    latest = (
-        Listing.objects.select_related("vendor", "category")
-        .filter(is_active=True)
-        .order_by("-created_at")[:8]
-    )
+    # only real country codes reach the cache key
+    country = countries.alpha2(request.GET.get("country", "")) or None
+    latest = latest_listings(get_language(), country=country)
     return render(request, "home/index.html", {"latest_listings": latest})
 
 def about(request):
@@ -1,8 +1,10 @@
 # i18n_pipeline.py
 from __future__ import annotations
-import os, sys, subprocess, codecs
+import os, sys, io, subprocess, argparse, hashlib, json, sqlite3, threading, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Iterable, List, NamedTuple
 import polib
 
 try:
@@ -17,6 +19,17 @@ LOCALE = ROOT / "locale"
 LANGS = ["ar", "de"]               # extend if needed
 EXTS = ["html", "txt", "py"]       # files scanned by makemessages
 
+# translation scheduler (see TranslationScheduler)
+WORKERS = 8                        # concurrent requests to the backend
+BATCH_SIZE = 25                    # chunks per worker task
+RATE_LIMIT = 10.0                  # backend calls per second, all workers together
+RETRIES = 3                        # attempts per chunk before keeping the source text
+JOBS = len(LANGS)                   # languages processed in parallel processes (see process_language)
+TM_PATH = ROOT / ".i18n_cache" / "tm.sqlite3"  # translation memory shared by all runs
+STATE_PATH = ROOT / ".i18n_cache" / "state.json"  # content hashes from the last run (see BuildState)
+TM_LOOKUP_CHUNK = 500              # sources per "IN (...)" lookup, well under SQLite's variable limit
+SKIP_DIRS = {"locale", "media", "staticfiles", "node_modules", "__pycache__", "venv", "env"}
+
 GLOSSARY: Dict[str, Dict[str, str]] = {
     "ar": {
         "All Products": "جميع المنتجات",
@@ -53,15 +66,89 @@ GLOSSARY: Dict[str, Dict[str, str]] = {
 # ----- UTIL -----
 def run(cmd: list[str]) -> int:
     print("+", " ".join(cmd))
-    return subprocess.run(cmd, check=False).returncode
+    # captured and re-printed so it lands in process_language's redirected output, not the terminal
+    proc = subprocess.run(cmd, check=False, capture_output=True, text=True)
+    if proc.stdout: print(proc.stdout, end="")
+    if proc.stderr: print(proc.stderr, end="")
+    return proc.returncode
 
-def strip_bom_and_fix_header(po_path: Path) -> None:
-    if not po_path.exists():
-        return
-    raw = codecs.open(po_path, "r", "utf-8-sig").read()
+def po_path_for(lang: str) -> Path:
+    return LOCALE / lang / "LC_MESSAGES" / "django.po"
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def file_digest(path: Path) -> str | None:
+    return digest(path.read_bytes()) if path.exists() else None
+
+class StageTimer:
+    """Wall time spent in each pipeline stage, summed over calls and reported at the end."""
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.monotonic() - started
+
+    def report(self) -> str:
+        return "timings: " + ", ".join(f"{name}={t:.2f}s" for name, t in self.stages.items())
+
+# ----- CHANGE DETECTION -----
+class BuildState:
+    """
+    Content hashes remembered between runs: every scanned source file (re-hashed only when
+    its mtime/size moved), each catalog as this pipeline last wrote it, each catalog as last
+    compiled, the seeded category names and the backend that translated. A stage's hashes
+    are only recorded once it succeeded. --force starts from an empty state.
+    """
+    def __init__(self, path: Path = STATE_PATH, force: bool = False):
+        self.path = path
+        data = {} if force or not path.exists() else json.loads(path.read_text(encoding="utf-8"))
+        self.sources: Dict[str, list] = data.get("sources", {})
+        self.catalogs: Dict[str, str] = data.get("catalogs", {})
+        self.compiled: Dict[str, str] = data.get("compiled", {})
+        self.categories: str | None = data.get("categories")
+        self.backend: str | None = data.get("backend")
+
+    def scan_sources(self) -> bool:
+        """Refresh source hashes; True if any EXTS file was added, removed or edited."""
+        seen: Dict[str, list] = {}
+        suffixes = {f".{e}" for e in EXTS}
+        for dirpath, dirnames, filenames in os.walk(ROOT):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+            for name in filenames:
+                if Path(name).suffix not in suffixes or name.startswith("."): continue
+                path = Path(dirpath) / name
+                rel, st = path.relative_to(ROOT).as_posix(), path.stat()
+                old = self.sources.get(rel)
+                if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                    seen[rel] = old
+                else:
+                    seen[rel] = [st.st_mtime_ns, st.st_size, digest(path.read_bytes())]
+        changed = {k: v[2] for k, v in seen.items()} != {k: v[2] for k, v in self.sources.items()}
+        self.sources = seen
+        return changed
+
+    def catalog_changed(self, lang: str) -> bool:
+        """True if the catalog differs from what this pipeline last wrote (edited, regenerated, new)."""
+        return file_digest(po_path_for(lang)) != self.catalogs.get(lang)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"sources": self.sources, "catalogs": self.catalogs, "compiled": self.compiled,
+                "categories": self.categories, "backend": self.backend}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+def strip_bom_and_fix_header(raw: str, lang: str) -> str:
+    raw = raw.lstrip("\ufeff")
     i = raw.find('msgid ""')
     if i == -1:
-        lang = po_path.parent.parent.name
         header = (
             'msgid ""\n'
             'msgstr ""\n'
@@ -73,7 +160,7 @@ def strip_bom_and_fix_header(po_path: Path) -> None:
         cleaned = header + "\n"
     else:
         cleaned = raw[i:]
-    po_path.write_text(cleaned, encoding="utf-8")
+    return cleaned
 
 def ensure_headers(po: polib.POFile, lang: str) -> None:
     po.metadata["Language"] = lang
@@ -116,7 +203,7 @@ def dedupe_inplace(po: polib.POFile) -> int:
         else:
             seen[key] = e
             kept.append(e)
-    po._entries = kept
+    po[:] = kept  # POFile is the list of entries itself
     return removed
 
 def fix_newline_parity(po: polib.POFile) -> int:
@@ -149,28 +236,183 @@ PH_RE = re.compile(
 def extract_placeholders(s: str):
     return [(m.start(), m.end(), m.group(0)) for m in PH_RE.finditer(s or "")]
 
-def translate_chunk(text: str, lang: str) -> str:
+# ----- TRANSLATION BACKENDS -----
+class GoogleBackend:
+    name = "google"
+    def __init__(self):
+        # GoogleTranslator keeps per-request state (_url_params): one client per thread and language
+        self._local = threading.local()
+    def translate(self, text: str, lang: str) -> str:
+        clients: Dict[str, Any] = self._local.__dict__.setdefault("clients", {})
+        client = clients.get(lang)
+        if client is None:
+            client = clients[lang] = GoogleTranslator(source="en", target=lang)
+        return client.translate(text)
+
+class StubBackend:
+    """Offline backend for tests and dry runs: tags the text instead of calling a service."""
+    name = "stub"
+    def translate(self, text: str, lang: str) -> str:
+        return f"[{lang}] {text}"
+
+BACKENDS = {"google": GoogleBackend, "stub": StubBackend}
+
+def make_backend(name: str = "google"):
+    if name == "google" and GoogleTranslator is None:
+        return None  # glossary only
+    return BACKENDS[name]()
+
+class RateLimiter:
+    """Spaces calls at least 1/per_second apart across threads."""
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+class TranslationMemory:
+    """
+    On-disk (source, lang, backend) -> translation store in SQLite. Entries imported from
+    populated .po files are stored under backend "po" and win over machine translations.
+    """
+    HUMAN = "po"
+
+    def __init__(self, path: Path = TM_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path), timeout=30)  # per-language processes share the file
+        self.db.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer (or each other)
+        self.db.execute("CREATE TABLE IF NOT EXISTS tm (source TEXT, lang TEXT, backend TEXT, target TEXT, "
+                        "PRIMARY KEY (source, lang, backend))")
+        self.hits = self.misses = self.stored = 0
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]], backend: str) -> Dict[Tuple[str, str], str]:
+        found: Dict[Tuple[str, str], str] = {}
+        pairs = list(pairs)
+        by_lang: Dict[str, List[str]] = {}
+        for source, lang in pairs: by_lang.setdefault(lang, []).append(source)
+        for lang, sources in by_lang.items():
+            for i in range(0, len(sources), TM_LOOKUP_CHUNK):
+                chunk = sources[i:i + TM_LOOKUP_CHUNK]
+                rows = self.db.execute(
+                    f"SELECT source, backend, target FROM tm WHERE lang = ? AND backend IN (?, ?) "
+                    f"AND source IN ({','.join('?' * len(chunk))})",
+                    (lang, self.HUMAN, backend, *chunk))
+                for source, row_backend, target in rows:
+                    if row_backend == self.HUMAN or (source, lang) not in found:
+                        found[(source, lang)] = target
+        self.hits += len(found)
+        self.misses += len(pairs) - len(found)
+        return found
+
+    def put_many(self, translations: Dict[Tuple[str, str], str], backend: str) -> None:
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO tm VALUES (?, ?, ?, ?)",
+                                [(s, lang, backend, t) for (s, lang), t in translations.items()])
+        self.stored += len(translations)
+
+    def import_po(self, po_path: Path) -> int:
+        """Store reviewed msgid/msgstr pairs (no fuzzy, no placeholders) from an existing catalog."""
+        po = polib.pofile(str(po_path), encoding="utf-8-sig")
+        lang = po.metadata.get("Language") or po_path.parent.parent.name
+        pairs = {(e.msgid, lang): e.msgstr for e in po
+                 if not e.obsolete and e.msgstr and e.msgstr != e.msgid and "fuzzy" not in e.flags
+                 and not e.msgid_plural and not extract_placeholders(e.msgid)}
+        self.put_many(pairs, self.HUMAN)
+        return len(pairs)
+
+    def report(self) -> str:
+        looked_up = self.hits + self.misses
+        rate = 100.0 * self.hits / looked_up if looked_up else 0.0
+        return f"translation memory: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), {self.stored} stored"
+
+_default_memory: TranslationMemory | None = None
+
+def default_memory() -> TranslationMemory:
+    global _default_memory
+    if _default_memory is None: _default_memory = TranslationMemory()
+    return _default_memory
+
+class TranslationScheduler:
+    """
+    Translates a set of (chunk, lang) pairs once each. The translation memory answers what it
+    can; the rest goes in per-language batches to a bounded thread pool, every backend call
+    passes the shared rate limiter, and failed calls are retried with backoff before falling
+    back to the source text (which is not remembered).
+    """
+    def __init__(self, backend, workers: int = WORKERS, batch_size: int = BATCH_SIZE,
+                 rate: float = RATE_LIMIT, retries: int = RETRIES, memory: TranslationMemory | None = None):
+        self.backend, self.workers, self.batch_size, self.retries = backend, workers, batch_size, retries
+        self.memory = memory
+        self.limiter = RateLimiter(rate)
+        self.calls = self.failures = 0
+        self._count_lock = threading.Lock()
+
+    def _one(self, text: str, lang: str) -> str | None:
+        for attempt in range(self.retries):
+            self.limiter.wait()
+            with self._count_lock: self.calls += 1
+            try:
+                out = self.backend.translate(text, lang)
+                return out if isinstance(out, str) and out else text
+            except Exception:
+                if attempt < self.retries - 1: time.sleep(0.5 * 2 ** attempt)
+        with self._count_lock: self.failures += 1
+        return None
+
+    def _batch(self, lang: str, texts: List[str]) -> List[Tuple[Tuple[str, str], str | None]]:
+        return [((t, lang), self._one(t, lang)) for t in texts]
+
+    def run(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        pairs = sorted(set(pairs), key=lambda p: (p[1], p[0]))
+        if self.backend is None:
+            return {p: p[0] for p in pairs}
+        done: Dict[Tuple[str, str], str] = {}
+        if self.memory is not None:
+            done.update(self.memory.get_many(pairs, self.backend.name))
+        by_lang: Dict[str, List[str]] = {}
+        for text, lang in pairs:
+            if (text, lang) not in done: by_lang.setdefault(lang, []).append(text)
+        batches = [(lang, texts[i:i + self.batch_size])
+                   for lang, texts in by_lang.items() for i in range(0, len(texts), self.batch_size)]
+        fresh: Dict[Tuple[str, str], str] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for results in pool.map(lambda b: self._batch(*b), batches):
+                for pair, out in results:
+                    done[pair] = pair[0] if out is None else out
+                    if out is not None: fresh[pair] = out
+        if self.memory is not None and fresh:
+            self.memory.put_many(fresh, self.backend.name)
+        return done
+
+# ----- TRANSLATION HELPERS -----
+def split_segments(s: str) -> List[Tuple[bool, str]]:
+    """[(is_placeholder, text)] pieces of `s`; only the non-placeholder pieces get translated."""
+    parts, last = [], 0
+    for start, end, ph in extract_placeholders(s):
+        if start > last: parts.append((False, s[last:start]))
+        parts.append((True, ph)); last = end
+    if last < len(s): parts.append((False, s[last:]))
+    return parts
+
+def needs_backend(text: str, lang: str) -> bool:
+    return bool(text) and not text.isspace() and text not in GLOSSARY.get(lang, {})
+
+def translate_chunk(text: str, lang: str, done: Dict[Tuple[str, str], str] | None = None) -> str:
     if not text or text.isspace(): return text or ""
     g = GLOSSARY.get(lang, {})
     if text in g: return g[text]
+    if done is not None and (text, lang) in done: return done[(text, lang)]
     if GoogleTranslator is None: return text
-    try:
-        out = GoogleTranslator(source="en", target=lang).translate(text)
-        return out if isinstance(out, str) and out else text
-    except Exception:
-        return text
+    return TranslationScheduler(GoogleBackend(), workers=1, memory=default_memory()).run([(text, lang)])[(text, lang)]
 
-def segment_translate(s: str, lang: str) -> str:
+def segment_translate(s: str, lang: str, done: Dict[Tuple[str, str], str] | None = None) -> str:
     if not s: return ""
-    phs = extract_placeholders(s)
-    if not phs: return translate_chunk(s, lang)
-    parts, last = [], 0
-    for start, end, ph in phs:
-        if start > last:
-            parts.append(translate_chunk(s[last:start], lang))
-        parts.append(ph); last = end
-    if last < len(s): parts.append(translate_chunk(s[last:], lang))
-    return "".join(parts)
+    return "".join(t if is_ph else translate_chunk(t, lang, done) for is_ph, t in split_segments(s))
 
 def validate_placeholders(src: str, dst: str) -> str:
     from collections import Counter
@@ -183,7 +425,7 @@ def validate_placeholders(src: str, dst: str) -> str:
     return (dst.rstrip()+" "+ " ".join(missing)).strip() if missing else dst
 
 # optional: seed Category names with msgctxt="category name"
-def seed_category_names() -> None:
+def category_names() -> List[str] | None:
     try:
         import django
         if not os.environ.get("DJANGO_SETTINGS_MODULE"):
@@ -191,51 +433,57 @@ def seed_category_names() -> None:
             os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
         django.setup()
         from catalog.models import Category
-        names = list(Category.objects.values_list("name", flat=True).distinct())
+        return sorted(set(Category.objects.values_list("name", flat=True)))
     except Exception as e:
         print(f"seed: skipped ({e.__class__.__name__}: {e})")
-        return
+        return None
 
-    for lang in LANGS:
-        po_path = LOCALE / lang / "LC_MESSAGES" / "django.po"
-        if not po_path.exists():
-            continue
-        po = polib.pofile(str(po_path), encoding="utf-8-sig")
-        existing = {(e.msgctxt, e.msgid) for e in po if not e.obsolete}
-        added = 0
-        for name in names:
-            key = ("category name", name)
-            if name and key not in existing:
-                po.append(polib.POEntry(msgctxt="category name", msgid=name, msgstr=""))
-                added += 1
-        if added:
-            po.save(str(po_path))
-            print(f"{lang}: seeded {added} category names")
-
-def process_po_file(po_path: Path) -> None:
-    strip_bom_and_fix_header(po_path)
-    lang = po_path.parent.parent.name
-    po = polib.pofile(str(po_path), encoding="utf-8")
-    ensure_headers(po, lang)
-    removed = dedupe_inplace(po)
+def seed_category_names(po: polib.POFile, names: List[str]) -> int:
+    existing = {(e.msgctxt, e.msgid) for e in po if not e.obsolete}
+    added = 0
+    for name in names:
+        key = ("category name", name)
+        if name and key not in existing:
+            po.append(polib.POEntry(msgctxt="category name", msgid=name, msgstr=""))
+            added += 1
+    return added
+
+def plural_count(lang: str) -> int:
+    return 6 if lang == "ar" else 2
 
+def pending_texts(po: polib.POFile, lang: str) -> List[str]:
+    """Source strings apply_translations would translate: empty msgstr / missing plural forms."""
+    out = []
+    for e in po:
+        if e.obsolete: continue
+        if not e.msgstr: out.append(e.msgid)
+        if e.msgid_plural and any(not e.msgstr_plural.get(i) for i in range(plural_count(lang))):
+            out.append(e.msgid_plural)
+    return out
+
+def pending_chunks(po: polib.POFile, lang: str) -> set:
+    """(chunk, lang) pairs that need the backend, placeholders and glossary hits excluded."""
+    return {(t, lang) for s in pending_texts(po, lang)
+            for is_ph, t in split_segments(s) if not is_ph and needs_backend(t, lang)}
+
+def apply_translations(po: polib.POFile, lang: str, done: Dict[Tuple[str, str], str] | None = None) -> int:
     changed = 0
     for e in po:
         if e.obsolete: continue
         # translate if empty
         if e.msgid_plural:
             if not e.msgstr:
-                s_tr = validate_placeholders(e.msgid, segment_translate(e.msgid, lang))
+                s_tr = validate_placeholders(e.msgid, segment_translate(e.msgid, lang, done))
                 if s_tr: e.msgstr = s_tr; changed += 1
-            plural_tr = validate_placeholders(e.msgid_plural, segment_translate(e.msgid_plural, lang))
             if not e.msgstr_plural: e.msgstr_plural = {}
-            plural_count = 6 if lang == "ar" else 2
-            for i in range(plural_count):
-                if not e.msgstr_plural.get(i):
+            missing = [i for i in range(plural_count(lang)) if not e.msgstr_plural.get(i)]
+            if missing:
+                plural_tr = validate_placeholders(e.msgid_plural, segment_translate(e.msgid_plural, lang, done))
+                for i in missing:
                     e.msgstr_plural[i] = plural_tr; changed += 1
         else:
             if not e.msgstr:
-                tr = validate_placeholders(e.msgid, segment_translate(e.msgid, lang))
+                tr = validate_placeholders(e.msgid, segment_translate(e.msgid, lang, done))
                 if tr and tr != e.msgid:
                     e.msgstr = tr; changed += 1
                 elif e.msgid in GLOSSARY.get(lang, {}):
@@ -243,53 +491,211 @@ def process_po_file(po_path: Path) -> None:
 
         if "fuzzy" in e.flags and e.msgstr:
             e.flags = [f for f in e.flags if f != "fuzzy"]
+    return changed
+
+class Catalog:
+    """
+    One .po file, read and parsed once: header fix, headers and dedupe happen on load, every
+    later stage edits `po` in memory, and save() writes it back once via a temp file + rename.
+    `digest` is the file as last read or written, so a caller can tell whether it is still current.
+    """
+    def __init__(self, path: Path, lang: str):
+        self.path, self.lang = path, lang
+        data = path.read_bytes()
+        self.digest = digest(data)
+        self.po = polib.pofile(strip_bom_and_fix_header(data.decode("utf-8-sig"), lang), encoding="utf-8")
+        ensure_headers(self.po, lang)
+        self.removed = dedupe_inplace(self.po)
+        self.seeded = self.changed = 0
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        self.po.save(str(tmp))
+        self.digest = file_digest(tmp)
+        os.replace(tmp, self.path)
 
-    changed += fix_newline_parity(po)
-    po.save(str(po_path))
-    print(f"{po_path}: deduped={removed}, updated={changed}")
+    def current(self) -> bool:
+        """True while nothing else has rewritten the file since it was loaded or saved."""
+        return file_digest(self.path) == self.digest
 
-def makemessages() -> None:
+def translate_catalogs(catalogs: List[Catalog], scheduler: TranslationScheduler, timer: StageTimer) -> None:
+    """Collect every missing chunk across all catalogs, translate each once, then apply in memory."""
+    pairs = set().union(*(pending_chunks(c.po, c.lang) for c in catalogs))
+    with timer("translate"):
+        done = scheduler.run(pairs)
+    print(f"translated {len(pairs)} unique chunks ({scheduler.calls} calls, {scheduler.failures} failed)")
+    with timer("apply"):
+        for c in catalogs:
+            c.changed += apply_translations(c.po, c.lang, done) + fix_newline_parity(c.po)
+
+class LangJob(NamedTuple):
+    lang: str
+    stale: bool                    # catalog changed since the last run: parse, translate, save
+    seed: bool                     # category names changed: parse, and save if any were added
+    names: List[str] | None        # category names to seed, None when unavailable
+    compiled: str | None           # digest of the catalog as last compiled
+    backend: str
+    workers: int
+    rate: float
+    memory: Path | None
+    # pre-clean's parse, passed on when makemessages left the file alone so it isn't parsed again
+    catalog: Catalog | None = None
+
+def process_language(job: LangJob) -> Dict[str, Any]:
+    """
+    Every per-language stage for one catalog (parse, seed, translate, fix, save, compile), run in
+    its own process. Console output is captured and returned so main() prints it in LANGS order.
+    """
+    out, timer, result = io.StringIO(), StageTimer(), {"lang": job.lang, "processed": False}
+    memory = None if job.memory is None else TranslationMemory(job.memory)
+    with redirect_stdout(out):
+        path = po_path_for(job.lang)
+        catalog, failed = None, 0
+        if job.stale or job.seed:
+            with timer("load"):
+                catalog = job.catalog or Catalog(path, job.lang)
+            if job.names is not None:
+                with timer("seed"):
+                    catalog.seeded = seed_category_names(catalog.po, job.names)
+                if catalog.seeded: print(f"{job.lang}: seeded {catalog.seeded} category names")
+        if catalog is not None and (job.stale or catalog.seeded):
+            scheduler = TranslationScheduler(make_backend(job.backend), workers=job.workers, rate=job.rate, memory=memory)
+            translate_catalogs([catalog], scheduler, timer)
+            with timer("write"):
+                catalog.save()
+            print(f"{path}: deduped={catalog.removed}, seeded={catalog.seeded}, updated={catalog.changed}")
+            result["processed"] = True
+            failed = scheduler.failures
+        current = file_digest(path)
+        # only failed backend calls keep the catalog stale; a translation equal to its source
+        # (de "Status") is an answer, and leaving it empty must not re-translate it every run
+        if failed: print(f"{job.lang}: {failed} chunks failed to translate; will retry next run")
+        result["catalog"] = None if failed else current
+        if current != job.compiled or not path.with_suffix(".mo").exists():
+            with timer("compilemessages"):
+                if compilemessages([job.lang]): result["compiled"] = current
+        print(f"{job.lang} {timer.report()}")
+    if memory is not None:
+        result["memory"] = (memory.hits, memory.misses, memory.stored)
+    result["output"] = out.getvalue()
+    return result
+
+def makemessages(langs: Iterable[str] = LANGS) -> bool:
     args = [sys.executable, str(MANAGE), "makemessages"]
-    for l in LANGS: args += ["-l", l]
+    for l in langs: args += ["-l", l]
     args += ["-e", ",".join(EXTS)]
     code = run(args)
     if code != 0:
         print("makemessages failed; continuing with existing .po files")
+    return code == 0
 
-def compilemessages() -> None:
+def compilemessages(langs: Iterable[str] = LANGS) -> bool:
     args = [sys.executable, str(MANAGE), "compilemessages"]
-    for l in LANGS: args += ["-l", l]
+    for l in langs: args += ["-l", l]
     code = run(args)
     if code != 0:
         print("compilemessages reported errors")
+    return code == 0
 
-def main() -> None:
-    # 0) pre-clean headers + dedupe to avoid msgmerge errors
-    for lang in LANGS:
-        po_path = LOCALE / lang / "LC_MESSAGES" / "django.po"
-        if po_path.exists():
-            strip_bom_and_fix_header(po_path)
-            po = polib.pofile(str(po_path), encoding="utf-8")
-            ensure_headers(po, lang)
-            removed = dedupe_inplace(po)
-            po.save(str(po_path))
-            print(f"{po_path}: pre-dedup removed={removed}")
-
-    # 1) extract from code/templates
-    makemessages()
-
-    # 2) seed DB-driven category names (optional, skips if Django not configured)
-    seed_category_names()
-
-    # 3) translate + tidy per file
-    for lang in LANGS:
-        po_path = LOCALE / lang / "LC_MESSAGES" / "django.po"
-        if po_path.exists():
-            process_po_file(po_path)
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Extract, translate and compile the project's .po catalogs.")
+    ap.add_argument("--backend", choices=sorted(BACKENDS), default="google",
+                    help="translation service; 'stub' works offline")
+    ap.add_argument("--workers", type=int, default=WORKERS, help="concurrent backend requests")
+    ap.add_argument("--rate", type=float, default=RATE_LIMIT, help="max backend calls per second (0 = unlimited)")
+    ap.add_argument("--memory", type=Path, default=TM_PATH, help="translation memory database")
+    ap.add_argument("--no-memory", action="store_true", help="neither read nor write the translation memory")
+    ap.add_argument("--import-po", nargs="*", type=Path, metavar="PO",
+                    help="seed the translation memory from populated .po files (default: this project's) and exit")
+    ap.add_argument("--force", action="store_true", help="ignore remembered hashes and run every stage")
+    ap.add_argument("--jobs", type=int, default=JOBS,
+                    help="languages processed in parallel processes (1 = serial, in this process)")
+    return ap.parse_args(argv)
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    memory = None if args.no_memory else TranslationMemory(args.memory)
+    if args.import_po is not None:
+        if memory is None: sys.exit("--import-po needs the translation memory; drop --no-memory")
+        paths = args.import_po or [po_path_for(lang) for lang in LANGS]
+        for path in paths:
+            print(f"{path}: imported {memory.import_po(path)} translations")
+        return
+
+    state = BuildState(STATE_PATH, force=args.force)
+    timer = StageTimer()
+    started = time.monotonic()
+    # catalogs touched outside this pipeline (hand edits, checkouts) since the last run
+    stale = {lang for lang in LANGS if state.catalog_changed(lang)}
+    if state.backend != args.backend:
+        stale = set(LANGS)  # another backend translated them
+    state.backend = args.backend
 
-    # 4) compile .mo
-    compilemessages()
-    print("i18n pipeline done.")
+    # 1) extract from code/templates, only if a scanned source changed
+    scanned = state.sources
+    precleaned: Dict[str, Catalog] = {}
+    with timer("scan"):
+        extract = state.scan_sources() or any(not po_path_for(lang).exists() for lang in LANGS)
+    if extract:
+        # msgmerge reads the catalogs from disk, so edited ones are deduped first; only catalogs
+        # that had duplicates are written, the rest stay as they are until their final save
+        with timer("pre-clean"):
+            for lang in sorted(stale):
+                if po_path_for(lang).exists():
+                    catalog = precleaned[lang] = Catalog(po_path_for(lang), lang)
+                    if catalog.removed:
+                        catalog.save()
+                        print(f"{catalog.path}: pre-dedup removed={catalog.removed}")
+        with timer("makemessages"):
+            extracted = makemessages()
+        if extracted:
+            stale = set(LANGS)
+        else:
+            state.sources = scanned  # keep the old hashes so the next run extracts again
+    else:
+        print("makemessages: sources unchanged, skipped")
+
+    # 2) DB-driven category names (optional, skipped if Django not configured)
+    with timer("categories"):
+        names = category_names()
+    names_digest = None if names is None else digest("\n".join(names).encode())
+    seed = names is not None and names_digest != state.categories
+
+    if names is not None:
+        state.categories = names_digest
+
+    # 3) per language, in parallel processes: parse once, seed, translate, fix, save, compile.
+    # Languages share nothing but the translation memory, so the output matches a serial run;
+    # the backend budget (--workers, --rate) is split between the processes.
+    jobs = max(1, min(args.jobs, len(LANGS)))
+    with timer("pre-clean"):
+        reusable = {lang: c for lang, c in precleaned.items() if c.current()}
+    todo = [LangJob(lang, lang in stale, seed, names, state.compiled.get(lang), args.backend,
+                    max(1, args.workers // jobs), args.rate / jobs, None if args.no_memory else args.memory,
+                    reusable.get(lang))
+            for lang in LANGS if po_path_for(lang).exists()]
+    with timer("languages"):
+        if jobs == 1:
+            results = [process_language(job) for job in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(process_language, todo))
+    for r in results:
+        print(r["output"], end="")
+        state.catalogs[r["lang"]] = r["catalog"]
+        if "compiled" in r: state.compiled[r["lang"]] = r["compiled"]
+        if memory is not None and "memory" in r:
+            hits, misses, stored = r["memory"]
+            memory.hits += hits; memory.misses += misses; memory.stored += stored
+    for lang in LANGS:
+        if not po_path_for(lang).exists(): state.catalogs[lang] = None
+    state.save()
+    if memory is not None: print(memory.report())
+    print(timer.report())
+    processed = [r["lang"] for r in results if r["processed"]]
+    compiled = [r["lang"] for r in results if "compiled" in r]
+    print(f"i18n pipeline done in {time.monotonic() - started:.1f}s with {jobs} job(s) "
+          f"(processed: {', '.join(processed) or 'none'}; compiled: {', '.join(compiled) or 'none'}).")
 
 if __name__ == "__main__":
     main()
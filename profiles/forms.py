@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django_countries.widgets import CountrySelectWidget
-from django.utils.text import slugify
+from catalog.slugs import allocate_slugs
 from .models import UserProfile, Vendor
 
 
@@ -45,15 +45,6 @@ class UserProfileForm(forms.ModelForm):
         }
 
 
-def _unique_slug(base: str) -> str:
-    base = slugify(base or "store")
-    slug = base or "store"
-    i = 2
-    while Vendor.objects.filter(slug=slug).exists():
-        slug = f"{base}-{i}"
-        i += 1
-    return slug
-
 class SellerOnboardingForm(forms.ModelForm):
     # make slug optional; we’ll auto-fill if missing
     slug = forms.SlugField(required=False)
@@ -73,8 +64,9 @@ class SellerOnboardingForm(forms.ModelForm):
     def clean_slug(self):
         slug = self.cleaned_data.get("slug")
         name = self.cleaned_data.get("display_name")
+        self.slug_generated = not slug
         if not slug:
-            return _unique_slug(name)
+            return allocate_slugs(Vendor, [name], fallback="store")[0]
         # ensure uniqueness if user typed a duplicate
         if Vendor.objects.filter(slug=slug).exists():
             raise forms.ValidationError("This slug is taken. Try another.")
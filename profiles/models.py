@@ -5,7 +5,8 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django_countries.fields import CountryField
 from django.utils.translation import gettext_lazy as _
-from django.utils.text import slugify
+
+from catalog.slugs import allocate_slugs
 
 
 class UserProfile(models.Model):
@@ -50,10 +51,17 @@ class Vendor(models.Model):
         verbose_name = _("Vendor")
         verbose_name_plural = _("Vendors")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "display_name" not in instance.get_deferred_fields():
+            # catalog re-indexes the vendor's listings only when this changes
+            instance._loaded_display_name = instance.display_name
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            base = slugify(self.display_name) or slugify(self.owner.username)
-            self.slug = base
+            self.slug = allocate_slugs(Vendor, [self.display_name or self.owner.username], fallback="store")[0]
         return super().save(*args, **kwargs)
 
     def __str__(self):
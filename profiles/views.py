@@ -4,6 +4,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.core.exceptions import PermissionDenied
 from .models import UserProfile, Vendor
 from .forms import UserForm, UserProfileForm, SellerOnboardingForm
+from catalog.slugs import save_with_unique_slug
 
 @login_required
 def profile(request):
@@ -56,7 +57,10 @@ def seller_onboarding(request):
             vendor.owner = request.user
             # new stores start inactive; activate in admin
             vendor.is_active = False
-            vendor.save()
+            if form.slug_generated:
+                save_with_unique_slug(vendor, vendor.display_name, fallback="store")
+            else:
+                vendor.save()
             prof = request.user.userprofile
             prof.is_seller = True
             prof.kyc_submitted = True
@@ -173,6 +173,19 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache
+# Version counters (category tree, homepage snapshots) and rebuild locks only work if every
+# worker process sees the same cache, so production uses Redis (REDIS_URL) or, without it,
+# the database cache table (`python manage.py createcachetable`). Per-process memory is
+# only used for local development.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+elif DEBUG:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}}
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,255 @@
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import i18n_pipeline as pipeline
+
+
+class CountingBackend(pipeline.StubBackend):
+    """StubBackend that counts calls and fails the first `fail` calls for each text."""
+    def __init__(self, fail=0):
+        self.fail, self.calls, self._lock = fail, {}, threading.Lock()
+
+    def translate(self, text, lang):
+        with self._lock:
+            n = self.calls[(text, lang)] = self.calls.get((text, lang), 0) + 1
+        if n <= self.fail:
+            raise ConnectionError("backend down")
+        return super().translate(text, lang)
+
+
+class TranslationMemoryTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.memory = pipeline.TranslationMemory(Path(tmp.name) / "tm.sqlite3")
+
+    def test_lookup_in_chunks_prefers_human_translations(self):
+        sources = [f"text {i}" for i in range(pipeline.TM_LOOKUP_CHUNK + 10)]
+        self.memory.put_many({(s, "de"): f"maschine {s}" for s in sources}, "stub")
+        self.memory.put_many({(sources[-1], "de"): "von Hand"}, self.memory.HUMAN)
+        pairs = [(s, "de") for s in sources] + [(sources[0], "ar")]
+        found = self.memory.get_many(pairs, "stub")
+        self.assertEqual(len(found), len(sources))
+        self.assertEqual(found[(sources[0], "de")], "maschine text 0")
+        self.assertEqual(found[(sources[-1], "de")], "von Hand")
+        self.assertEqual((self.memory.hits, self.memory.misses), (len(sources), 1))
+        self.assertEqual(self.memory.db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+
+class TranslationSchedulerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.memory = pipeline.TranslationMemory(Path(tmp.name) / "tm.sqlite3")
+
+    def scheduler(self, backend, **kwargs):
+        kwargs.setdefault("rate", 0)
+        return pipeline.TranslationScheduler(backend, workers=4, batch_size=2, memory=self.memory, **kwargs)
+
+    def test_each_pair_is_translated_once_and_remembered(self):
+        backend = CountingBackend()
+        pairs = [("Hello", "de"), ("Hello", "de"), ("Hello", "ar"), ("Bye", "de")] * 3
+        done = self.scheduler(backend).run(pairs)
+        self.assertEqual(done[("Hello", "de")], "[de] Hello")
+        self.assertEqual(set(backend.calls.values()), {1})
+        again = CountingBackend()
+        self.assertEqual(self.scheduler(again).run(pairs), done)
+        self.assertEqual(again.calls, {})
+
+    def test_retries_then_falls_back_to_source_without_remembering(self):
+        flaky = CountingBackend(fail=1)
+        scheduler = self.scheduler(flaky, retries=2)
+        self.assertEqual(scheduler.run([("Cart", "de")]), {("Cart", "de"): "[de] Cart"})
+        self.assertEqual((scheduler.calls, scheduler.failures), (2, 0))
+        down = CountingBackend(fail=2)
+        scheduler = self.scheduler(down, retries=2)
+        self.assertEqual(scheduler.run([("Checkout", "de")]), {("Checkout", "de"): "Checkout"})
+        self.assertEqual(scheduler.failures, 1)
+        self.assertEqual(self.memory.get_many([("Checkout", "de")], down.name), {})
+
+    def test_rate_limit_is_shared_by_all_workers(self):
+        pairs = [(f"text {i}", "de") for i in range(5)]
+        started = time.monotonic()
+        self.scheduler(CountingBackend(), rate=20).run(pairs)
+        self.assertGreaterEqual(time.monotonic() - started, 4 / 20 - 0.01)
+
+
+class CatalogTests(unittest.TestCase):
+    PO = ('\ufeffmsgid ""\nmsgstr ""\n\nmsgid "Hello"\nmsgstr ""\n\n'
+          '#: a.py:1\nmsgid "Hello"\nmsgstr "Hallo"\n')
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "django.po"
+        self.path.write_text(self.PO, encoding="utf-8")
+
+    def test_load_fixes_headers_and_dedupes(self):
+        catalog = pipeline.Catalog(self.path, "de")
+        self.assertEqual(catalog.removed, 1)
+        self.assertEqual([(e.msgid, e.msgstr) for e in catalog.po], [("Hello", "Hallo")])
+        self.assertEqual(catalog.po.metadata["Language"], "de")
+
+    def test_save_replaces_the_file_and_tracks_it(self):
+        catalog = pipeline.Catalog(self.path, "de")
+        self.assertTrue(catalog.current())
+        catalog.save()
+        self.assertEqual(list(self.path.parent.iterdir()), [self.path])
+        self.assertTrue(catalog.current())
+        self.assertEqual(pipeline.polib.pofile(str(self.path)).find("Hello").msgstr, "Hallo")
+        self.path.write_text(self.PO, encoding="utf-8")
+        self.assertFalse(catalog.current())
+
+
+class FailingBackend(pipeline.StubBackend):
+    name = "failing"
+
+    def translate(self, text, lang):
+        raise ConnectionError("backend down")
+
+
+class PipelineStateTests(unittest.TestCase):
+    PO = 'msgid ""\nmsgstr ""\n"Language: de\\n"\n\nmsgid "Hello"\nmsgstr ""\n'
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "views.py").write_text("_('Hello')\n")
+        self.po = self.root / "locale" / "de" / "LC_MESSAGES" / "django.po"
+        self.po.parent.mkdir(parents=True)
+        self.po.write_text(self.PO, encoding="utf-8")
+        self.make = mock.Mock(return_value=True)
+        self.compile = mock.Mock(return_value=True)
+        patches = [
+            mock.patch.multiple(
+                pipeline, ROOT=self.root, LOCALE=self.root / "locale", LANGS=["de"],
+                STATE_PATH=self.root / "state.json", makemessages=self.make, compilemessages=self.compile,
+                category_names=mock.Mock(return_value=None),
+            ),
+            mock.patch.dict(pipeline.BACKENDS, failing=FailingBackend),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def run_pipeline(self, *args):
+        with redirect_stdout(io.StringIO()):
+            pipeline.main(["--no-memory", "--jobs", "1", *args])
+        return json.loads((self.root / "state.json").read_text())
+
+    def test_failed_makemessages_extracts_again(self):
+        self.make.return_value = False
+        self.assertEqual(self.run_pipeline("--backend", "stub")["sources"], {})
+        self.make.return_value = True
+        self.assertIn("views.py", self.run_pipeline("--backend", "stub")["sources"])
+        self.assertEqual(self.make.call_count, 2)
+        self.run_pipeline("--backend", "stub")
+        self.assertEqual(self.make.call_count, 2)
+
+    def test_failed_compile_is_retried(self):
+        self.compile.return_value = False
+        self.assertNotIn("de", self.run_pipeline("--backend", "stub")["compiled"])
+        self.compile.return_value = True
+        self.assertIn("de", self.run_pipeline("--backend", "stub")["compiled"])
+        self.assertEqual(self.compile.call_count, 2)
+
+    def test_untranslated_catalog_stays_stale(self):
+        state = self.run_pipeline("--backend", "failing")
+        self.assertIsNone(state["catalogs"]["de"])
+        state = self.run_pipeline("--backend", "stub")
+        self.assertEqual(state["backend"], "stub")
+        self.assertIsNotNone(state["catalogs"]["de"])
+        self.assertIn('msgstr "[de] Hello"', self.po.read_text(encoding="utf-8"))
+
+    def test_source_identical_translation_settles(self):
+        with mock.patch.object(pipeline.StubBackend, "translate", lambda self, text, lang: text):
+            self.assertIsNotNone(self.run_pipeline("--backend", "stub")["catalogs"]["de"])
+            with mock.patch.object(pipeline, "translate_catalogs") as translate:
+                self.run_pipeline("--backend", "stub")
+                translate.assert_not_called()
+
+    def test_glossary_only_run_settles(self):
+        with mock.patch.object(pipeline, "GoogleTranslator", None):
+            self.assertIsNotNone(self.run_pipeline("--backend", "google")["catalogs"]["de"])
+
+    def count_io(self, *args):
+        """Run the pipeline; return (catalog parses, catalog saves)."""
+        with mock.patch.object(pipeline.polib, "pofile", wraps=pipeline.polib.pofile) as parse, \
+                mock.patch.object(pipeline.Catalog, "save", autospec=True, side_effect=pipeline.Catalog.save) as save:
+            self.run_pipeline("--backend", "stub", *args)
+        return parse.call_count, save.call_count
+
+    def test_extraction_run_parses_and_saves_each_catalog_once(self):
+        self.assertEqual(self.count_io(), (1, 1))
+        self.make.assert_called_once()
+
+    def test_duplicates_are_written_before_makemessages(self):
+        self.po.write_text(self.PO + '\nmsgid "Hello"\nmsgstr ""\n', encoding="utf-8")
+        self.make.side_effect = lambda: self.assertEqual(self.po.read_text(encoding="utf-8").count('"Hello"'), 1) or True
+        self.assertEqual(self.count_io(), (1, 2))
+
+    def test_catalog_rewritten_by_makemessages_is_parsed_again(self):
+        def extract():
+            with self.po.open("a", encoding="utf-8") as f:
+                f.write('\nmsgid "Bye"\nmsgstr ""\n')
+            return True
+        self.make.side_effect = extract
+        self.assertEqual(self.count_io(), (2, 1))
+        self.assertIn('msgstr "[de] Bye"', self.po.read_text(encoding="utf-8"))
+
+    def test_switching_backend_reprocesses(self):
+        self.run_pipeline("--backend", "stub")
+        with mock.patch.object(pipeline, "translate_catalogs") as translate:
+            self.run_pipeline("--backend", "stub")
+            translate.assert_not_called()
+            self.run_pipeline("--backend", "failing")
+            translate.assert_called_once()
+
+
+class ParallelLanguagesTests(unittest.TestCase):
+    PO = 'msgid ""\nmsgstr ""\n"Language: {lang}\\n"\n\nmsgid "Hello %(name)s"\nmsgstr ""\n\nmsgid "Home"\nmsgstr ""\n'
+
+    def build(self, jobs):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = Path(tmp.name)
+        (root / "views.py").write_text("_('Home')\n")
+        for lang in pipeline.LANGS:
+            po = root / "locale" / lang / "LC_MESSAGES" / "django.po"
+            po.parent.mkdir(parents=True)
+            po.write_text(self.PO.format(lang=lang), encoding="utf-8")
+        out = io.StringIO()
+        with mock.patch.multiple(
+            pipeline, ROOT=root, LOCALE=root / "locale", STATE_PATH=root / "state.json",
+            makemessages=mock.Mock(return_value=True), compilemessages=mock.Mock(return_value=True),
+            category_names=mock.Mock(return_value=["Cars"]),
+        ), redirect_stdout(out):
+            pipeline.main(["--backend", "stub", "--no-memory", "--jobs", str(jobs)])
+            catalogs = {lang: pipeline.po_path_for(lang).read_text(encoding="utf-8") for lang in pipeline.LANGS}
+        output = out.getvalue().replace(str(root), "<root>")
+        return catalogs, [l for l in output.splitlines() if "timings:" not in l and "done in" not in l]
+
+    def test_parallel_run_matches_serial_run(self):
+        serial, serial_out = self.build(jobs=1)
+        parallel, parallel_out = self.build(jobs=len(pipeline.LANGS))
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_out, serial_out)
+        self.assertIn('msgstr "[de] Hello %(name)s"', serial["de"])
+        self.assertIn('msgstr "Startseite"', serial["de"])
+
+    def test_subprocess_output_is_captured(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = pipeline.run([sys.executable, "-c", "import sys; print('to stdout'); sys.exit('to stderr')"])
+        self.assertEqual(code, 1)
+        self.assertIn("to stdout", out.getvalue())
+        self.assertIn("to stderr", out.getvalue())